@@ -0,0 +1,3 @@
+"""D-Bus and container runtime benchmarking tools."""
+
+__version__ = "0.1.0"
@@ -0,0 +1,5 @@
+import sys
+
+from dbusbench.cli import main
+
+sys.exit(main())
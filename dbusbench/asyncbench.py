@@ -0,0 +1,478 @@
+import asyncio
+import argparse
+import time
+import json
+import signal
+from collections import deque
+from datetime import datetime
+
+from dbusbench import busfilter
+from dbusbench import busstats
+from dbusbench import busstore
+from dbusbench import clocksync
+from dbusbench import config
+from dbusbench import metrics
+from dbusbench import procstat
+from dbusbench import segments
+from dbusbench import selfstat
+
+DURATION = 1000
+
+d = "{:%Y%m%d_%H%M%S}".format(datetime.now())
+OUTPUT_FILE = f"results_{d}.json"
+BUS_OUTPUT_FILE = f"bus_{d}.json"
+BUS_OUTPUT_DIR = f"bus_{d}"
+CONN_OUTPUT_FILE = f"conns_{d}.json"
+
+
+async def get_num_containers(runtime):
+    if runtime.lower() == "gvisor":
+        cmd = "ps aux | grep -v grep | grep runsc-sandbox | wc -l"
+    elif runtime.lower() == "runc":
+        cmd = "runc list | grep running | wc -l"
+    else:
+        assert False
+
+    proc = await asyncio.create_subprocess_shell(
+        cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    stdout, _ = await proc.communicate()
+    return int(stdout.decode().strip())
+
+
+async def get_busctl_latency():
+    t0 = time.monotonic()
+    proc = await asyncio.create_subprocess_shell(
+        "busctl get-property org.freedesktop.systemd1 /org/freedesktop/systemd1 org.freedesktop.systemd1.Manager Version",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    await proc.communicate()
+    return time.monotonic() - t0
+
+
+async def container_updater(shared, runtime, interval=1.0):
+    while not shared["stop"]:
+        try:
+            shared["num_containers"] = await get_num_containers(runtime)
+        except Exception:
+            # Unknown (None, NaN in plots), so a failed count isn't read as all stopped
+            shared["num_containers"] = None
+        await asyncio.sleep(interval)
+
+
+async def latency_updater(shared, latency_hist, interval=1.0):
+    while not shared["stop"]:
+        try:
+            shared["busctl_latency"] = await get_busctl_latency()
+            latency_hist.observe(shared["busctl_latency"])
+        except Exception:
+            shared["busctl_latency"] = -1
+        await asyncio.sleep(interval)
+
+
+PAYLOAD_KEY = b',"payload":'
+_decode = json.JSONDecoder().raw_decode
+
+
+def split_line(raw):
+    """
+    (header dict, payload JSON bytes) for one busctl --json=short line. Only
+    the header is decoded; busctl writes "payload" as the last key, and a
+    quote inside a JSON string is always escaped, so the first unescaped
+    ',"payload":' is the key itself.
+    """
+    i = raw.find(PAYLOAD_KEY)
+    if i < 0:
+        return json.loads(raw), b"null"
+    header = _decode(raw[:i].decode() + "}")[0]
+    return header, raw[i + len(PAYLOAD_KEY):raw.rindex(b"}")]
+
+
+def handle_line(line):
+    # Epoch seconds are timezone-free; alignment across hosts is fleet.py's job
+    obj = {
+        "timestamp": line["timestamp-realtime"] / 1_000_000,
+        "type": line.get("type"),
+        "sender": line.get("sender"),
+        "destination": line.get("destination"),
+        "path": line.get("path"),
+        "interface": line.get("interface"),
+        "member": line.get("member"),
+        "_payload": line.get("payload"),
+    }
+    return obj
+
+
+def start_background(shared, runtime, latency_hist, proc_sampler=None):
+    """Start the container/latency updaters, the loop-lag timer and /proc reads."""
+    loop_lag = selfstat.LoopLag()
+    tasks = [
+        asyncio.create_task(container_updater(shared, runtime)),
+        asyncio.create_task(latency_updater(shared, latency_hist)),
+        asyncio.create_task(loop_lag.run()),
+    ]
+    if proc_sampler is not None:
+        tasks.append(asyncio.create_task(proc_sampler.run()))
+    return tasks, selfstat.SelfSampler(loop_lag)
+
+
+async def stop_background(shared, tasks):
+    shared["stop"] = True
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def monitor_dbus(
+    runtime, duration=DURATION, registry=None, bus_log=None, match_rules=None,
+    proc_sampler=None,
+):
+    proc = await asyncio.create_subprocess_exec(
+        "busctl",
+        "monitor",
+        "--system",
+        "--json=short",
+        *(f"--match={rule}" for rule in match_rules or []),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+
+    window = deque(maxlen=10)
+    # With match rules the monitor only sees part of the traffic; the daemon's
+    # read syscall rate still shows the load on the whole bus
+    counter = busfilter.TrafficCounter() if match_rules else None
+    reads_window = deque(maxlen=10)
+    last_reads = 0
+    data_log = []
+    if bus_log is None:
+        bus_log = busstore.MessageStore()
+    shared = {"num_containers": None, "busctl_latency": -1, "stop": False}
+
+    if registry is None:
+        registry = metrics.Registry()
+    msg_counter = registry.counter("dbus_messages", "D-Bus messages seen by the monitor")
+    member_counter = registry.counter(
+        "dbus_member_messages", "D-Bus messages by member", label="member"
+    )
+    rate_gauge = registry.gauge("dbus_msgs_per_sec", "Windowed D-Bus message rate")
+    reads_gauge = registry.gauge(
+        "dbus_daemon_reads_per_sec", "Bus daemon read syscalls per second (not messages)"
+    )
+    container_gauge = registry.gauge("containers", "Running containers")
+    latency_hist = registry.histogram(
+        "busctl_latency_seconds", "busctl get-property round-trip latency"
+    )
+
+    tasks, self_sampler = start_background(shared, runtime, latency_hist, proc_sampler)
+    if counter is not None:
+        tasks.append(asyncio.create_task(counter.run()))
+
+    current_count = 0
+    last_sample_time = time.time()
+    start_time = last_sample_time
+
+    try:
+        while True:
+            now = time.time()
+            if now - start_time >= duration:
+                break
+            if proc.stdout.at_eof():
+                break
+
+            try:
+                raw = await asyncio.wait_for(proc.stdout.readline(), timeout=0.1)
+                if raw.strip():
+                    header, payload = split_line(raw)
+                    line = handle_line(header)
+                    bus_log.append_raw(line, payload)
+                    current_count += 1
+                    msg_counter.inc()
+                    member_counter.inc(key=line["member"] or "")
+            except asyncio.TimeoutError:
+                pass
+
+            if now - last_sample_time >= 0.1:
+                window.append(current_count)
+                avg = sum(window) / len(window)
+                obj = {
+                    "timestamp": now,
+                    "avg_msgs_per_sec": avg * 10,
+                    "num_containers": shared["num_containers"],
+                    "busctl_latency": shared["busctl_latency"],
+                }
+                if counter is not None:
+                    reads = counter.reads
+                    if reads is None:
+                        # Unknown, not zero
+                        reads_window.clear()
+                        obj["daemon_reads_per_sec"] = None
+                    else:
+                        reads_window.append(reads - last_reads)
+                        last_reads = reads
+                        obj["daemon_reads_per_sec"] = sum(reads_window) / len(reads_window) * 10
+                obj.update(self_sampler.sample())
+                if proc_sampler is not None:
+                    obj.update(proc_sampler.sample())
+                data_log.append(obj)
+                rate_gauge.set(obj["avg_msgs_per_sec"])
+                if obj.get("daemon_reads_per_sec") is not None:
+                    reads_gauge.set(obj["daemon_reads_per_sec"])
+                if obj["num_containers"] is not None:
+                    container_gauge.set(obj["num_containers"])
+                current_count = 0
+                last_sample_time = now
+
+    except asyncio.CancelledError:
+        print(">>> monitor_dbus: CancelledError caught. Exiting early.")
+        # Don't re-raise, we want to return the collected data
+
+    finally:
+        await stop_background(shared, tasks)
+        proc.terminate()
+
+    return (data_log, bus_log)
+
+
+async def monitor_stats(
+    runtime, duration=DURATION, registry=None, address=None, interval=1.0, proc_sampler=None
+):
+    """
+    Collect the same data_log from the daemon's Debug.Stats interface instead
+    of a full eavesdrop. There is no message count, so avg_msgs_per_sec is
+    None and daemon_reads_per_sec stands in as the load signal. Returns
+    (data_log, conn_log) where conn_log holds one row per connection per tick.
+    """
+    poller = busstats.StatsPoller(address)
+    data_log = []
+    conn_log = []
+    shared = {"num_containers": None, "busctl_latency": -1, "stop": False}
+
+    if registry is None:
+        registry = metrics.Registry()
+    reads_gauge = registry.gauge(
+        "dbus_daemon_reads_per_sec", "Bus daemon read syscalls per second (not messages)"
+    )
+    conn_gauge = registry.gauge("dbus_connections", "Connections on the bus")
+    container_gauge = registry.gauge("containers", "Running containers")
+    latency_hist = registry.histogram(
+        "busctl_latency_seconds", "busctl get-property round-trip latency"
+    )
+
+    tasks, self_sampler = start_background(shared, runtime, latency_hist, proc_sampler)
+    start_time = time.time()
+
+    try:
+        while time.time() - start_time < duration:
+            tick = time.time()
+            totals, conns = await poller.poll()
+            obj = {
+                "timestamp": tick,
+                # Debug.Stats has no message counter
+                "avg_msgs_per_sec": None,
+                "daemon_reads_per_sec": totals.pop("daemon_reads_per_sec"),
+                "daemon_read_bytes_per_sec": totals.pop("daemon_read_bytes_per_sec"),
+                "num_containers": shared["num_containers"],
+                "busctl_latency": shared["busctl_latency"],
+            }
+            obj.update({f"bus_{k}": v for k, v in totals.items()})
+            obj.update(self_sampler.sample())
+            if proc_sampler is not None:
+                obj.update(proc_sampler.sample())
+            data_log.append(obj)
+            conn_log.extend(conns)
+            if obj["daemon_reads_per_sec"] is not None:
+                reads_gauge.set(obj["daemon_reads_per_sec"])
+            if obj["bus_connections"] is not None:
+                conn_gauge.set(obj["bus_connections"])
+            if obj["num_containers"] is not None:
+                container_gauge.set(obj["num_containers"])
+            await asyncio.sleep(max(0.0, interval - (time.time() - tick)))
+
+    except asyncio.CancelledError:
+        print(">>> monitor_stats: CancelledError caught. Exiting early.")
+
+    finally:
+        await stop_background(shared, tasks)
+        await poller.close()
+
+    return (data_log, conn_log)
+
+
+async def main(args, rules=None):
+    data = []
+    if args.collector == "stats":
+        bus = []
+    elif args.segment_seconds:
+        bus = segments.SegmentWriter(BUS_OUTPUT_DIR, args.segment_seconds)
+    else:
+        bus = busstore.MessageStore()
+    shutdown_event = asyncio.Event()
+    registry = metrics.Registry()
+    server = None
+    clock = clocksync.ClockLog(args.reference_clock)
+    clock_task = asyncio.create_task(clock.run())
+    proc_sampler = None if args.no_proc else procstat.ProcSampler(args.proc or None)
+
+    def signal_handler():
+        print("\n>>> Ctrl+C received. Shutting down gracefully...")
+        shutdown_event.set()
+
+    # Set up signal handler for graceful shutdown
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGINT, signal_handler)
+    loop.add_signal_handler(signal.SIGTERM, signal_handler)
+
+    try:
+        if args.metrics_port is not None:
+            server = await metrics.serve(registry, args.metrics_port)
+
+        # Create the monitoring task
+        if args.collector == "stats":
+            monitor = monitor_stats(
+                args.runtime, registry=registry, address=args.address,
+                interval=args.stats_interval, proc_sampler=proc_sampler,
+            )
+        else:
+            monitor = monitor_dbus(
+                args.runtime, registry=registry, bus_log=bus, match_rules=rules,
+                proc_sampler=proc_sampler,
+            )
+        monitor_task = asyncio.create_task(monitor)
+
+        # Wait for either the task to complete or shutdown signal
+        _done, pending = await asyncio.wait(
+            [monitor_task, asyncio.create_task(shutdown_event.wait())],
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+
+        if shutdown_event.is_set():
+            # Shutdown was requested, cancel the monitor task
+            monitor_task.cancel()
+            try:
+                data, bus = await monitor_task
+            except asyncio.CancelledError:
+                # This shouldn't happen since monitor_dbus doesn't re-raise CancelledError
+                data = None
+                bus = None
+        else:
+            # Normal completion
+            data, bus = monitor_task.result()
+
+        # Cancel any remaining pending tasks
+        for task in pending:
+            task.cancel()
+
+    except Exception as e:
+        print(f">>> Unexpected error: {e}")
+    finally:
+        if server is not None:
+            server.close()
+        clock_task.cancel()
+        print(f"Saving {len(data)} records to {OUTPUT_FILE}")
+        with open(OUTPUT_FILE, "w") as f:
+            json.dump(data, f, indent=2)
+        clock.save(OUTPUT_FILE)
+        if args.collector == "stats":
+            print(f"Saving {len(bus)} connection records to {CONN_OUTPUT_FILE}")
+            with open(CONN_OUTPUT_FILE, "w") as f:
+                json.dump(bus, f)
+        elif isinstance(bus, segments.SegmentWriter):
+            bus.close()
+            print(f"Saved {len(bus)} records in {len(bus.index['segments'])} segments to {BUS_OUTPUT_DIR}")
+        else:
+            print(f"Saving {len(bus)} records to {BUS_OUTPUT_FILE}")
+            # Raw payloads may hold non-ASCII text
+            with open(BUS_OUTPUT_FILE, "w", encoding="utf-8") as f:
+                bus.dump_json(f)
+        print("Done.")
+
+
+def cli(argv=None, prog=None, defaults=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Monitor D-Bus load vs. container count")
+    parser.add_argument("runtime", choices=["gvisor", "runc"])
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="serve live OpenMetrics on this port while monitoring",
+    )
+    parser.add_argument(
+        "--segment-seconds",
+        type=float,
+        default=0,
+        help="write the bus capture as a segmented, time-indexed directory "
+        "with segments of this length instead of one JSON file",
+    )
+    parser.add_argument(
+        "--collector",
+        choices=["monitor", "stats"],
+        default="monitor",
+        help="'monitor' eavesdrops with busctl monitor; 'stats' polls the "
+        "daemon's Debug.Stats interface instead (no message rate, only the "
+        "daemon's read syscall rate)",
+    )
+    parser.add_argument(
+        "--address",
+        default=None,
+        help="bus address for --collector stats (default: system bus)",
+    )
+    parser.add_argument("--stats-interval", type=float, default=1.0)
+    parser.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        help="only capture messages matching this spec (preset name such as "
+        "'systemd' or 'cgroup', or key=value[,key=value]); repeatable. "
+        "avg_msgs_per_sec then counts matching messages only",
+    )
+    parser.add_argument(
+        "--filter-file",
+        help="JSON list of filter specs, added to any --filter options",
+    )
+    parser.add_argument(
+        "--reference-clock",
+        metavar="HOST[:PORT]",
+        help="record offsets against a 'dbusbench clock serve' reference server so "
+        "results from several hosts can be merged with 'dbusbench fleet'",
+    )
+    parser.add_argument(
+        "--proc",
+        action="append",
+        default=[],
+        metavar="LABEL=COMM[,COMM...]",
+        help="sample CPU, context switches, RSS and fds of these processes (comm "
+        "names or pids) instead of the bus daemon, PID 1 and runtime shims; repeatable",
+    )
+    parser.add_argument("--no-proc", action="store_true", help="don't sample other processes")
+    config.apply_defaults(parser, defaults)
+    args = parser.parse_args(argv)
+    try:
+        args.proc = procstat.parse_targets(args.proc)
+    except ValueError as e:
+        parser.error(str(e))
+    specs = list(args.filter)
+    if args.filter_file:
+        specs += busfilter.load_filter_file(args.filter_file)
+    if specs and args.collector == "stats":
+        parser.error("--filter/--filter-file only apply to --collector monitor")
+    try:
+        rules = busfilter.match_rules(specs)
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        asyncio.run(main(args, rules))
+    except KeyboardInterrupt:
+        # This should not happen now since we handle SIGINT in the event loop
+        print("\n>>> Fallback Ctrl+C handler. Data may not be saved.")
+
+
+if __name__ == "__main__":
+    cli()
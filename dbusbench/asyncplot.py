@@ -0,0 +1,76 @@
+import matplotlib.pyplot as plt
+import numpy as np
+from datetime import datetime
+import json
+import sys
+
+from dbusbench import raster
+from dbusbench import selfstat
+
+d = "{:%Y%m%d_%H%M%S}".format(datetime.now())
+OUTFILE = f"plot_latency_{d}.png"
+DPI = 150
+COLUMNS = [
+    "timestamp", "avg_msgs_per_sec", "num_containers", "busctl_latency",
+    "loop_lag", "self_cpu_pct", "daemon_reads_per_sec",
+]
+
+
+def plot(data, outfile=OUTFILE):
+    # Parse data into epoch-float columns
+    plot_columns(raster.columns(data, COLUMNS), outfile)
+
+
+def plot_columns(cols, outfile=OUTFILE):
+    times = cols["timestamp"]
+
+    # Base figure and first axis
+    fig, ax1 = plt.subplots(figsize=(19.20, 10.80))
+    nbins = raster.pixel_width(fig, DPI)
+
+    ax1.set_xlabel("Time")
+    # Stats-collector runs have no message count, only the daemon's reads
+    rate, rate_label = cols["avg_msgs_per_sec"], "Messages/sec"
+    if np.isnan(rate).all() and not np.isnan(cols["daemon_reads_per_sec"]).all():
+        rate, rate_label = cols["daemon_reads_per_sec"], "Daemon reads/sec"
+    ax1.set_ylabel(rate_label, color="blue")
+    raster.plot_envelope(ax1, times, rate, nbins, "blue", rate_label)
+    ax1.tick_params(axis="y", labelcolor="blue")
+    ax1.xaxis_date()
+
+    # Second axis (containers)
+    ax2 = ax1.twinx()
+    ax2.set_ylabel("Num Containers", color="green")
+    raster.plot_envelope(ax2, times, cols["num_containers"], nbins, "green", "Containers")
+    ax2.tick_params(axis="y", labelcolor="green")
+
+    # Third axis (latency) - offset to avoid overlap
+    ax3 = ax1.twinx()
+    ax3.spines["right"].set_position(("outward", 60))  # Offset third y-axis
+    ax3.set_ylabel("Busctl Latency", color="red")
+    raster.plot_envelope(ax3, times, cols["busctl_latency"], nbins, "red", "Busctl Latency")
+    ax3.tick_params(axis="y", labelcolor="red")
+
+    # Grey out intervals where the collector itself was saturated
+    mask = (cols["loop_lag"] > selfstat.LAG_SATURATED) | (
+        cols["self_cpu_pct"] > selfstat.CPU_SATURATED
+    )
+    for i, (start, end) in enumerate(raster.runs(times, mask)):
+        ax1.axvspan(
+            *raster.to_num([start, end]),
+            color="grey",
+            alpha=0.3,
+            label="Collector saturated" if i == 0 else None,
+        )
+
+    fig.tight_layout()
+    fig.autofmt_xdate()
+    plt.title("D-Bus Load, Container Count, and Busctl Latency")
+    # plt.show()
+    plt.savefig(outfile, dpi=DPI, bbox_inches="tight")
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1]) as f:
+        plot(json.loads(f.read()))
@@ -0,0 +1,284 @@
+"""
+Minimal asyncio D-Bus client: one persistent connection for method calls.
+
+Spawning busctl per call makes every call a new bus client, so the daemon
+also processes a Hello and broadcasts NameOwnerChanged twice for each one.
+The stats collector polls the bus many times a tick, so it keeps a single
+connection open instead. Only what the collectors need is implemented:
+EXTERNAL auth over a unix socket, pipelined method calls with string
+arguments, and unmarshalling of any reply (little- or big-endian).
+"""
+
+import asyncio
+import os
+import struct
+
+SYSTEM_BUS_ADDRESS = "unix:path=/run/dbus/system_bus_socket"
+# Seconds to wait for a reply (busctl waits 25; a poller can't)
+CALL_TIMEOUT = 5.0
+
+METHOD_CALL, METHOD_RETURN, ERROR, SIGNAL = 1, 2, 3, 4
+# Header field codes
+PATH, INTERFACE, MEMBER, ERROR_NAME, REPLY_SERIAL, DESTINATION, SENDER, SIGNATURE = 1, 2, 3, 4, 5, 6, 7, 8
+
+ALIGN = {
+    "y": 1, "b": 4, "n": 2, "q": 2, "i": 4, "u": 4, "x": 8, "t": 8, "d": 8, "h": 4,
+    "s": 4, "o": 4, "g": 1, "v": 1, "a": 4, "(": 8, "{": 8,
+}
+FIXED = {
+    "y": "B", "b": "I", "n": "h", "q": "H", "i": "i", "u": "I", "x": "q", "t": "Q", "d": "d", "h": "I",
+}
+
+
+class DBusError(RuntimeError):
+    """Error reply to a method call (a RuntimeError like a failed busctl call)."""
+
+    def __init__(self, name, message=""):
+        super().__init__(f"{name}: {message}" if message else name)
+        self.name = name
+
+
+def socket_path(address=None):
+    """Socket path for a bus address (default: the system bus)."""
+    address = address or os.environ.get("DBUS_SYSTEM_BUS_ADDRESS", SYSTEM_BUS_ADDRESS)
+    for entry in address.split(";"):
+        transport, _, params = entry.partition(":")
+        if transport != "unix":
+            continue
+        kv = dict(p.split("=", 1) for p in params.split(",") if "=" in p)
+        if "path" in kv:
+            return kv["path"]
+        if "abstract" in kv:
+            return "\0" + kv["abstract"]
+    raise ValueError(f"no unix socket in bus address {address!r}")
+
+
+def split_types(sig):
+    """Split a signature into its single complete types."""
+    out = []
+    i = 0
+    while i < len(sig):
+        j = _type_end(sig, i)
+        out.append(sig[i:j])
+        i = j
+    return out
+
+
+def _type_end(sig, i):
+    c = sig[i]
+    if c == "a":
+        return _type_end(sig, i + 1)
+    if c in "({":
+        close = ")" if c == "(" else "}"
+        i += 1
+        while sig[i] != close:
+            i = _type_end(sig, i)
+        return i + 1
+    return i + 1
+
+
+class _Reader:
+    """Unmarshal values from a message, aligned relative to ``base``."""
+
+    def __init__(self, data, base, little):
+        self.data = data
+        self.base = base
+        self.pos = base
+        self.prefix = "<" if little else ">"
+
+    def align(self, n):
+        self.pos += -(self.pos - self.base) % n
+
+    def fixed(self, code):
+        fmt = self.prefix + FIXED[code]
+        size = struct.calcsize(fmt)
+        self.align(size)
+        (value,) = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += size
+        return bool(value) if code == "b" else value
+
+    def read(self, sig):
+        c = sig[0]
+        if c in FIXED:
+            return self.fixed(c)
+        if c in "so":
+            n = self.fixed("u")
+            s = self.data[self.pos:self.pos + n].decode()
+            self.pos += n + 1
+            return s
+        if c == "g":
+            n = self.data[self.pos]
+            s = self.data[self.pos + 1:self.pos + 1 + n].decode()
+            self.pos += n + 2
+            return s
+        if c == "v":
+            return self.read(self.read("g"))
+        if c == "(":
+            self.align(8)
+            return tuple(self.read(t) for t in split_types(sig[1:-1]))
+        if c == "a":
+            n = self.fixed("u")
+            elem = sig[1:]
+            self.align(ALIGN[elem[0]])
+            end = self.pos + n
+            if elem[0] == "{":
+                key_sig, value_sig = split_types(elem[1:-1])
+                out = {}
+                while self.pos < end:
+                    self.align(8)
+                    key = self.read(key_sig)
+                    out[key] = self.read(value_sig)
+                return out
+            items = []
+            while self.pos < end:
+                items.append(self.read(elem))
+            return items
+        raise ValueError(f"unsupported signature {sig!r}")
+
+
+class _Writer:
+    """Marshal the little-endian values a method call needs."""
+
+    def __init__(self):
+        self.buf = bytearray()
+
+    def align(self, n):
+        self.buf += b"\0" * (-len(self.buf) % n)
+
+    def write(self, sig, value):
+        c = sig[0]
+        if c in FIXED:
+            fmt = "<" + FIXED[c]
+            self.align(struct.calcsize(fmt))
+            self.buf += struct.pack(fmt, value)
+        elif c in "so":
+            data = value.encode()
+            self.write("u", len(data))
+            self.buf += data + b"\0"
+        elif c == "g":
+            data = value.encode()
+            self.buf += bytes([len(data)]) + data + b"\0"
+        elif c == "v":
+            value_sig, inner = value
+            self.write("g", value_sig)
+            self.write(value_sig, inner)
+        elif c == "(":
+            self.align(8)
+            for t, v in zip(split_types(sig[1:-1]), value):
+                self.write(t, v)
+        elif c == "a":
+            # Only what the header needs: arrays of structs
+            self.align(4)
+            at = len(self.buf)
+            self.buf += b"\0\0\0\0"
+            self.align(ALIGN[sig[1]])
+            start = len(self.buf)
+            for v in value:
+                self.write(sig[1:], v)
+            struct.pack_into("<I", self.buf, at, len(self.buf) - start)
+        else:
+            raise ValueError(f"unsupported signature {sig!r}")
+
+
+class Connection:
+    """A persistent bus connection; call() may be used concurrently."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.serial = 0
+        self.pending = {}
+        self.unique_name = None
+        self.task = asyncio.create_task(self._dispatch())
+
+    @classmethod
+    async def open(cls, address=None):
+        reader, writer = await asyncio.open_unix_connection(socket_path(address))
+        uid = str(os.getuid()).encode().hex()
+        writer.write(b"\0AUTH EXTERNAL " + uid.encode() + b"\r\n")
+        reply = await reader.readline()
+        if not reply.startswith(b"OK"):
+            writer.close()
+            raise DBusError("org.freedesktop.DBus.Error.AuthFailed", reply.decode().strip())
+        writer.write(b"BEGIN\r\n")
+        conn = cls(reader, writer)
+        conn.unique_name = await conn.call(
+            "org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus", "Hello"
+        )
+        return conn
+
+    async def call(self, destination, path, interface, member, signature="", *args):
+        """Call a method and return its reply: one value, a tuple, or None."""
+        if self.task.done():
+            raise ConnectionError("bus connection lost")
+        self.serial += 1
+        serial = self.serial
+        body = _Writer()
+        for t, v in zip(split_types(signature), args):
+            body.write(t, v)
+        fields = [
+            (PATH, ("o", path)), (INTERFACE, ("s", interface)),
+            (MEMBER, ("s", member)), (DESTINATION, ("s", destination)),
+        ]
+        if signature:
+            fields.append((SIGNATURE, ("g", signature)))
+        msg = _Writer()
+        msg.buf += struct.pack("<cBBBII", b"l", METHOD_CALL, 0, 1, len(body.buf), serial)
+        msg.write("a(yv)", fields)
+        msg.align(8)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[serial] = future
+        self.writer.write(bytes(msg.buf + body.buf))
+        try:
+            return await asyncio.wait_for(future, CALL_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.pending.pop(serial, None)
+            raise DBusError(
+                "org.freedesktop.DBus.Error.NoReply", f"no reply to {member} in {CALL_TIMEOUT}s"
+            ) from None
+
+    async def _dispatch(self):
+        try:
+            while True:
+                fixed = await self.reader.readexactly(16)
+                little = fixed[:1] == b"l"
+                prefix = "<" if little else ">"
+                msg_type = fixed[1]
+                body_len, _serial, fields_len = struct.unpack_from(prefix + "III", fixed, 4)
+                rest = await self.reader.readexactly(
+                    fields_len + (-(16 + fields_len) % 8) + body_len
+                )
+                data = fixed + rest
+                fields = _Reader(data, 0, little)
+                fields.pos = 12
+                header = fields.read("a(yv)")
+                fields = dict(header)
+                if msg_type not in (METHOD_RETURN, ERROR):
+                    continue
+                future = self.pending.pop(fields.get(REPLY_SERIAL), None)
+                if future is None or future.done():
+                    continue
+                body_start = 16 + fields_len + (-(16 + fields_len) % 8)
+                body = _Reader(data, body_start, little)
+                values = [body.read(t) for t in split_types(fields.get(SIGNATURE, ""))]
+                if msg_type == ERROR:
+                    future.set_exception(
+                        DBusError(fields.get(ERROR_NAME, "?"), values[0] if values else "")
+                    )
+                else:
+                    future.set_result(
+                        None if not values else values[0] if len(values) == 1 else tuple(values)
+                    )
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"bus connection lost: {e}"))
+            self.pending.clear()
+
+    async def close(self):
+        self.task.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
@@ -0,0 +1,118 @@
+"""
+Server-side filtering for the bus monitor.
+
+A filter spec is turned into D-Bus match rules that are handed to
+``busctl monitor --match=...``, so uninteresting traffic never reaches our
+process. avg_msgs_per_sec then counts matching messages only. As a cheap
+signal of the load on the whole bus, TrafficCounter reads the daemon's read
+syscall counter in /proc/<pid>/io (as busstats does) for the separate
+daemon_reads_per_sec column. Those are reads, about two per message, not
+messages.
+
+Spec syntax (one per --filter, any number of them, OR-ed together):
+    systemd                                       a preset name
+    interface=org.freedesktop.systemd1.Manager    key=value[,key=value...]
+    type='signal',member='UnitNew'                a raw match rule
+"""
+
+import json
+
+from dbusbench import busconn
+from dbusbench.busstats import DBUS, read_io
+
+MATCH_KEYS = {
+    "type", "sender", "destination", "path", "path_namespace", "interface",
+    "member", "eavesdrop",
+} | {f"arg{i}" for i in range(64)} | {f"arg{i}path" for i in range(64)}
+
+PRESETS = {
+    "systemd": [
+        "sender='org.freedesktop.systemd1'",
+        "destination='org.freedesktop.systemd1'",
+    ],
+    # Unit and scope lifecycle that container starts with -systemd-cgroup cause
+    "cgroup": [
+        "interface='org.freedesktop.systemd1.Manager'",
+        "interface='org.freedesktop.systemd1.Scope'",
+        "interface='org.freedesktop.systemd1.Unit'",
+        "type='signal',interface='org.freedesktop.DBus.Properties',"
+        "path_namespace='/org/freedesktop/systemd1/unit'",
+    ],
+}
+
+def _rule(spec):
+    parts = []
+    for item in spec.split(","):
+        key, sep, value = item.partition("=")
+        key = key.strip()
+        if not sep or key not in MATCH_KEYS:
+            raise ValueError(f"bad filter term {item!r}: expected <match key>=<value>")
+        value = value.strip()
+        if not (value.startswith("'") and value.endswith("'")):
+            value = "'" + value.replace("'", "'\\''") + "'"
+        parts.append(f"{key}={value}")
+    return ",".join(parts)
+
+
+def match_rules(specs):
+    """Expand filter specs (presets or key=value lists) into match rules."""
+    rules = []
+    for spec in specs:
+        rules.extend(PRESETS[spec] if spec in PRESETS else [_rule(spec)])
+    return rules
+
+
+def load_filter_file(filename):
+    """Config form: a JSON list of spec strings or {key: value} objects."""
+    with open(filename) as f:
+        entries = json.load(f)
+    return [
+        e if isinstance(e, str) else ",".join(f"{k}={v}" for k, v in e.items())
+        for e in entries
+    ]
+
+
+class TrafficCounter:
+    """The bus daemon's read syscalls and bytes since run(), from /proc/<pid>/io."""
+
+    def __init__(self, address=None):
+        self.address = address
+        self.pid = None
+        self.base = None
+
+    async def run(self):
+        """Find the daemon's pid and take the baseline counters."""
+        try:
+            conn = await busconn.Connection.open(self.address)
+            try:
+                self.pid = await conn.call(
+                    *DBUS, DBUS[0], "GetConnectionUnixProcessID", "s", DBUS[0]
+                )
+            finally:
+                await conn.close()
+        except (OSError, RuntimeError) as e:
+            print(f">>> TrafficCounter: can't find the bus daemon ({e}); no daemon read rate")
+            return
+        self.base = self._read()
+
+    def _read(self):
+        try:
+            return read_io(self.pid)
+        except OSError:
+            # Needs root (ptrace access to the daemon)
+            return None
+
+    def _since_start(self, key):
+        if self.pid is None or self.base is None:
+            return None
+        io = self._read()
+        return None if io is None else io[key] - self.base[key]
+
+    @property
+    def reads(self):
+        """Read syscalls since run(), or None when the daemon's io can't be read."""
+        return self._since_start("syscr")
+
+    @property
+    def read_bytes(self):
+        return self._since_start("rchar")
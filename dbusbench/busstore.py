@@ -0,0 +1,229 @@
+"""
+Compact in-memory store for captured D-Bus messages.
+
+Each string field is dictionary-encoded into a per-field table and kept as
+a uint32 id column, timestamps are a float64 column, and payloads are kept
+as compact JSON bytes in a single arena that is only decoded on access.
+Compared to one dict per message this is roughly an order of magnitude less
+memory, and it converts straight to NumPy/pandas for the plotting side.
+"""
+
+import json
+from array import array
+
+FIELDS = ("type", "sender", "destination", "path", "interface", "member")
+
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class StringTable:
+    """Bidirectional string <-> small int mapping; id 0 is always None."""
+
+    __slots__ = ("ids", "strings")
+
+    def __init__(self):
+        self.ids = {None: 0}
+        self.strings = [None]
+
+    def intern(self, s):
+        i = self.ids.get(s)
+        if i is None:
+            i = self.ids[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class Message:
+    """Lightweight view of one stored message; fields are read on access."""
+
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store, i):
+        self._store = store
+        self._i = i
+
+    @property
+    def timestamp(self):
+        return self._store.timestamps[self._i]
+
+    @property
+    def payload(self):
+        return self._store.payload(self._i)
+
+    def to_dict(self):
+        d = {"timestamp": self.timestamp}
+        for field in FIELDS:
+            d[field] = getattr(self, field)
+        d["_payload"] = self.payload
+        return d
+
+    def __repr__(self):
+        return f"Message({self.to_dict()!r})"
+
+
+def _field_property(field):
+    def get(self):
+        store = self._store
+        return store.tables[field].strings[store.columns[field][self._i]]
+
+    return property(get)
+
+
+for _field in FIELDS:
+    setattr(Message, _field, _field_property(_field))
+
+
+class MessageStore:
+    """Append-only columnar message log."""
+
+    def __init__(self):
+        self.timestamps = array("d")
+        self.tables = {field: StringTable() for field in FIELDS}
+        self.columns = {field: array("I") for field in FIELDS}
+        self.payload_offsets = array("Q", [0])
+        self.payloads = bytearray()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return Message(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield Message(self, i)
+
+    def append(self, msg):
+        """Add one message dict with its payload decoded under "_payload"."""
+        self.append_raw(msg, _dumps(msg.get("_payload")).encode())
+
+    def append_raw(self, msg, payload):
+        """
+        Add one message whose payload is still JSON bytes, as sliced out of a
+        busctl line by asyncbench.split_line; ``msg["_payload"]`` is ignored.
+        """
+        self.timestamps.append(msg["timestamp"])
+        columns = self.columns
+        tables = self.tables
+        for field in FIELDS:
+            columns[field].append(tables[field].intern(msg.get(field)))
+        self.payloads += payload
+        self.payload_offsets.append(len(self.payloads))
+
+    def extend(self, msgs):
+        for msg in msgs:
+            self.append(msg)
+
+    def extend_encoded(self, timestamps, ids, strings, offsets, payloads):
+        """
+        Bulk-append already encoded columns (e.g. a slice of a capture segment).
+
+        ``ids[field]`` are indices into ``strings[field]``, ``offsets`` has one
+        more entry than ``timestamps`` and indexes into ``payloads``.
+        """
+        import numpy as np
+
+        self.timestamps.frombytes(np.ascontiguousarray(timestamps, dtype="<f8").tobytes())
+        for field in FIELDS:
+            table = self.tables[field]
+            remap = np.array([table.intern(x) for x in strings[field]], dtype=np.uint32)
+            self.columns[field].frombytes(remap[np.asarray(ids[field])].tobytes())
+        offsets = np.asarray(offsets, dtype=np.uint64)
+        base = len(self.payloads)
+        self.payloads += bytes(payloads[int(offsets[0]):int(offsets[-1])])
+        shifted = offsets[1:] - offsets[0] + np.uint64(base)
+        self.payload_offsets.frombytes(shifted.astype("<u8").tobytes())
+
+    def payload_bytes(self, i):
+        return bytes(self.payloads[self.payload_offsets[i]:self.payload_offsets[i + 1]])
+
+    def payload_size(self, i):
+        return self.payload_offsets[i + 1] - self.payload_offsets[i]
+
+    def payload(self, i):
+        return json.loads(self.payload_bytes(i))
+
+    def nbytes(self):
+        """Approximate memory held by the columns and the payload arena."""
+        n = self.timestamps.itemsize * len(self.timestamps)
+        n += sum(c.itemsize * len(c) for c in self.columns.values())
+        n += self.payload_offsets.itemsize * len(self.payload_offsets)
+        return n + len(self.payloads)
+
+    def dump_json(self, f):
+        """
+        Write the legacy list-of-objects JSON, one message per line. Payloads
+        are written through as stored, without being decoded.
+        """
+        # Each interned string is encoded once, prefixed with its key
+        encoded = [
+            [f', "{field}": {json.dumps(s)}' for s in self.tables[field].strings]
+            for field in FIELDS
+        ]
+        columns = [self.columns[field] for field in FIELDS]
+        offsets = self.payload_offsets
+        payloads = self.payloads
+        f.write("[\n")
+        for i, ts in enumerate(self.timestamps):
+            if i:
+                f.write(",\n")
+            f.write("{\"timestamp\": " + json.dumps(ts))
+            f.write("".join(enc[col[i]] for enc, col in zip(encoded, columns)))
+            f.write(', "_payload": ')
+            f.write(payloads[offsets[i]:offsets[i + 1]].decode() or "null")
+            f.write("}")
+        f.write("\n]\n")
+
+    def to_numpy(self):
+        """Structured array of timestamp, field ids and payload offsets."""
+        import numpy as np
+
+        dtype = [("timestamp", "<f8")] + [(f, "<u4") for f in FIELDS] + [
+            ("payload_offset", "<u8"),
+            ("payload_size", "<u4"),
+        ]
+        out = np.empty(len(self), dtype=dtype)
+        out["timestamp"] = np.frombuffer(self.timestamps, dtype="<f8")
+        for field in FIELDS:
+            out[field] = np.frombuffer(self.columns[field], dtype=np.uint32)
+        offsets = np.frombuffer(self.payload_offsets, dtype=np.uint64)
+        out["payload_offset"] = offsets[:-1]
+        out["payload_size"] = np.diff(offsets)
+        return out
+
+    def to_dataframe(self):
+        """
+        DataFrame with one categorical column per field, decoded without
+        materializing a string per row. ``row`` indexes back into the store.
+        """
+        import numpy as np
+        import pandas as pd
+
+        cols = {"timestamp": np.frombuffer(self.timestamps, dtype="<f8")}
+        for field in FIELDS:
+            # Id 0 is None; from_codes uses -1 for missing values
+            codes = np.frombuffer(self.columns[field], dtype=np.uint32).astype(np.int32) - 1
+            cols[field] = pd.Categorical.from_codes(
+                codes, categories=pd.Index(self.tables[field].strings[1:], dtype=object)
+            )
+        cols["payload_size"] = np.diff(np.frombuffer(self.payload_offsets, dtype=np.uint64))
+        cols["row"] = np.arange(len(self))
+        return pd.DataFrame(cols)
+
+    @classmethod
+    def from_records(cls, records):
+        store = cls()
+        store.extend(records)
+        return store
+
+    @classmethod
+    def load_json(cls, filename):
+        with open(filename) as f:
+            return cls.from_records(json.load(f))
@@ -0,0 +1,53 @@
+"""
+dbusbench: one entry point for the D-Bus benchmarking tools.
+
+Only the module for the chosen subcommand is imported, so collectors start
+without touching NumPy, pandas, matplotlib or bokeh.
+"""
+
+import argparse
+import importlib
+import sys
+
+from dbusbench import config
+
+# subcommand -> (module, summary)
+COMMANDS = {
+    "monitor": ("asyncbench", "monitor bus load vs. container count"),
+    "probe": ("mon3", "probe busctl latency once a second"),
+    "load": ("simulation", "generate open/closed-loop load or search for the knee"),
+    "orchestrate": ("orchestrate", "run the container-scaling experiment"),
+    "plot": ("plot", "plot result files"),
+    "serve": ("serve", "explore a run in the browser"),
+    "report": ("report", "render figures/tables for a results tree"),
+    "lifecycle": ("lifecycle", "attribute bus traffic to container starts/stops"),
+    "segments": ("segments", "convert/query segmented bus captures"),
+    "fleet": ("fleet", "merge results from several hosts"),
+    "clock": ("clocksync", "reference clock server and offset probe"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="dbusbench",
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(
+            f"  {name:12s} {summary}" for name, (_module, summary) in COMMANDS.items()
+        ),
+    )
+    parser.add_argument(
+        "--config",
+        help=f"JSON file of defaults per subcommand (or ${config.CONFIG_ENV})",
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+
+    module = importlib.import_module(f"dbusbench.{COMMANDS[args.command][0]}")
+    defaults = config.section(config.load(args.config), args.command)
+    return module.cli(args.args, prog=f"dbusbench {args.command}", defaults=defaults)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Clock records for aligning results collected on many hosts.
+
+Every collector writes a ``<results file>.clock.json`` sidecar holding host
+metadata and (monotonic, realtime) clock pairs taken at start and every
+``interval`` seconds afterwards. When a reference time server is given, each
+pair also carries an NTP-style offset estimate against it. fleet.py uses the
+sidecars to put every host on one timeline.
+
+Run a reference server on the orchestrator with:
+    dbusbench clock serve [--port 12321]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import struct
+import time
+
+from dbusbench import config
+
+PORT = 12321
+INTERVAL = 10.0
+_PACKET = struct.Struct("!dd")
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def host_metadata():
+    return {
+        "hostname": socket.gethostname(),
+        "boot_id": _read("/proc/sys/kernel/random/boot_id"),
+        "machine_id": _read("/etc/machine-id"),
+        "kernel": platform.release(),
+        "pid": os.getpid(),
+    }
+
+
+def clock_pair():
+    """Monotonic/realtime pair; ``uncertainty`` is how long reading both took."""
+    m0 = time.monotonic()
+    r = time.time()
+    m1 = time.monotonic()
+    return {"monotonic": (m0 + m1) / 2, "realtime": r, "uncertainty": m1 - m0}
+
+
+def probe_reference(address, timeout=0.5):
+    """
+    One request/response to a reference server. Returns (offset, rtt) where
+    offset = reference clock - local realtime.
+    """
+    host, _, port = address.partition(":")
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        t0 = time.time()
+        sock.sendto(_PACKET.pack(t0, 0.0), (host, int(port or PORT)))
+        data, _ = sock.recvfrom(_PACKET.size)
+        t3 = time.time()
+    echoed, ref = _PACKET.unpack(data)
+    if echoed != t0:
+        raise OSError("stale reply from reference server")
+    return ref - (t0 + t3) / 2, t3 - t0
+
+
+class ClockLog:
+    """Collects clock samples for one run; ``run`` samples periodically."""
+
+    def __init__(self, reference=None, interval=INTERVAL):
+        self.reference = reference
+        self.interval = interval
+        self.host = host_metadata()
+        self.samples = []
+        self.sample()
+
+    def sample(self):
+        s = clock_pair()
+        if self.reference:
+            try:
+                s["ref_offset"], s["ref_rtt"] = probe_reference(self.reference)
+            except OSError:
+                pass
+        self.samples.append(s)
+        return s
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            # The reference probe blocks for up to its timeout
+            await loop.run_in_executor(None, self.sample)
+
+    def to_dict(self):
+        return {"host": self.host, "reference": self.reference, "samples": self.samples}
+
+    def save(self, results_file):
+        """Take a final sample and write the sidecar next to ``results_file``."""
+        self.sample()
+        path = results_file + ".clock.json"
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+def serve(port=PORT):
+    """Answer each probe with our realtime clock (blocking)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("0.0.0.0", port))
+        print(f">>> Reference clock serving on udp/{port}")
+        while True:
+            data, addr = sock.recvfrom(_PACKET.size)
+            if len(data) != _PACKET.size:
+                continue
+            t0, _ = _PACKET.unpack(data)
+            sock.sendto(_PACKET.pack(t0, time.time()), addr)
+
+
+def cli(argv=None, prog=None, defaults=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Reference clock server")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("serve", help="run the reference time server")
+    p.add_argument("--port", type=int, default=PORT)
+    p = sub.add_parser("probe", help="measure offset against a reference server")
+    p.add_argument("address", help="host[:port]")
+    config.apply_defaults(parser, defaults)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "serve":
+        serve(args.port)
+    else:
+        offset, rtt = probe_reference(args.address)
+        print(f"offset {offset * 1000:+.3f} ms, rtt {rtt * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,46 @@
+"""
+Shared defaults for the dbusbench subcommands.
+
+A config file is JSON with a "common" section applied to every subcommand
+and one section per subcommand, keyed by option name:
+
+    {
+        "common": {"reference-clock": "10.0.0.1:12321"},
+        "monitor": {"collector": "stats", "metrics-port": 9100},
+        "load": {"slo-ms": 20}
+    }
+
+Options a subcommand doesn't have are ignored, and anything given on the
+command line still wins.
+"""
+
+import argparse
+import json
+import os
+
+CONFIG_ENV = "DBUSBENCH_CONFIG"
+
+
+def load(path=None):
+    path = path or os.environ.get(CONFIG_ENV)
+    if not path:
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def section(config, command):
+    merged = {**config.get("common", {}), **config.get(command, {})}
+    return {key.replace("-", "_"): value for key, value in merged.items()}
+
+
+def apply_defaults(parser, defaults):
+    """Set ``defaults`` on ``parser`` and its subcommand parsers where they apply."""
+    if not defaults:
+        return
+    dests = {a.dest for a in parser._actions}
+    parser.set_defaults(**{k: v for k, v in defaults.items() if k in dests})
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            for sub in action.choices.values():
+                apply_defaults(sub, defaults)
@@ -0,0 +1,79 @@
+import argparse
+import runpy
+
+import pandas as pd
+import matplotlib.pyplot as plt
+import numpy as np
+import re
+
+
+def load_group(file_list):
+    """Concatenate the probe latencies (in ms) of every file in a group."""
+    dfs = []
+    for filename in file_list:
+        df = pd.read_json(filename)
+        df["latency"] = df["latency"] * 1000
+        dfs.append(df)
+    combined = pd.concat(dfs, ignore_index=True)
+    return combined["latency"].to_numpy()
+
+
+def load_dataset(path):
+    """(label, file_list) pairs from the ``groups`` a dataset script defines.
+
+    ``groups`` may be a dict or a list of pairs; file names are taken
+    relative to the current directory, as the script itself sees them.
+    """
+    groups = runpy.run_path(path)["groups"]
+    return list(groups.items()) if isinstance(groups, dict) else list(groups)
+
+
+def dataset_args(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("dataset", help="Python file defining groups = {label: [probe files]}")
+    return parser.parse_args()
+
+
+def plot_ecdf(groups_ms, outfile):
+    """One ECDF line per (label, latencies_ms) group on a shared axis."""
+    fig = plt.figure(figsize=(19.2, 10.8), dpi=200)
+
+    for label, latencies in groups_ms:
+        # Sort values for ECDF
+        sorted_vals = np.sort(latencies)
+        y_vals = np.arange(1, len(sorted_vals) + 1) / len(sorted_vals)
+
+        # Plot ECDF line
+        plt.plot(sorted_vals, y_vals, linestyle="-", label=label)
+
+        '''
+        # Percentile annotations
+        for perc in [0, 50, 90, 95]:
+            t = np.percentile(sorted_vals, perc)
+            # Find the closest y-value in the ECDF for this x
+            y_pos = y_vals[np.searchsorted(sorted_vals, t)]
+            plt.axvline(t, alpha=0.15, color="C0", linestyle="--")
+            # Place text slightly above the curve
+            plt.text(t, y_pos + 0.02, f"p{perc}: {t:.2f} ms",
+                    rotation=0, va="bottom", ha="center", fontsize=6, color="C0") 
+        '''
+
+    plt.xlabel("lag (ms)")
+    plt.ylabel("Cumulative probability")
+    plt.title("DBus Lag ECDF Comparison (Averaged Groups)")
+    plt.grid(True, linestyle="--", alpha=0.6)
+    plt.legend()
+
+    plt.savefig(outfile)
+    return fig
+
+
+if __name__ == "__main__":
+    groups = load_dataset(dataset_args("ECDF of probe latencies per group").dataset)
+
+    # Save with nice filename
+    safe_filename = re.sub(r"[^\w\-]", "_", "dbus_lag_ecdf_comparison_grouped") + ".png"
+    plot_ecdf([(label, load_group(file_list)) for label, file_list in groups], safe_filename)
+    print(f"Saved plot as {safe_filename}")
+
+    plt.show()
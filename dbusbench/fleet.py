@@ -0,0 +1,380 @@
+"""
+Merge results collected on many hosts onto one timeline.
+
+Every collector writes a ``.clock.json`` sidecar (see clocksync.py) next to
+its results. For each host we map local realtime stamps back to the host's
+monotonic clock, which undoes NTP steps during the run, and then fit
+``fleet time - monotonic = offset + drift * monotonic`` to the reference
+probes. Hosts without reference probes keep their own realtime clock as of
+the end of the run, so they are only as aligned as NTP left them.
+
+Writes to the output directory:
+    alignment.json        per-host offset, drift and fit residual
+    aligned/<host>/...    every input (and its bus_/conns_ siblings) re-stamped
+    rates.json            fleet-wide rate series (asyncplot-compatible)
+    probes.json           all probe latencies, sorted, with their host
+    latency_hist.json     per-host and fleet latency histograms + percentiles
+
+Usage:
+    dbusbench fleet merge <DIR or FILE> [...] [--out DIR] [--step SECONDS]
+    dbusbench fleet synth <DIR> [--hosts N] [--duration SECONDS] [--seed N]
+"""
+
+import argparse
+import json
+import os
+import warnings
+
+import numpy as np
+
+from dbusbench import config
+from dbusbench.metrics import LATENCY_BUCKETS
+from dbusbench.report import PERCENTILES, classify
+
+CLOCK_SUFFIX = ".clock.json"
+# Results files whose timestamps share a host clock with results_<run>.json
+SIBLING_PREFIXES = ("bus_", "conns_")
+# Reference probes slower than this (relative to the fastest) are queued or
+# retransmitted and would bias the fit
+RTT_SLACK = 0.001
+STEP_THRESHOLD = 0.001
+# Per-tick columns merged into rates.json
+RATE_KEYS = ("avg_msgs_per_sec", "daemon_reads_per_sec", "num_containers", "busctl_latency")
+
+
+def discover(paths):
+    """Results files (those with a clock sidecar) under ``paths``."""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path.removesuffix(CLOCK_SUFFIX))
+            continue
+        for dirpath, _dirnames, filenames in os.walk(path):
+            for name in filenames:
+                if name.endswith(CLOCK_SUFFIX):
+                    found.append(os.path.join(dirpath, name.removesuffix(CLOCK_SUFFIX)))
+    return sorted(set(found))
+
+
+def siblings(path):
+    """bus_/conns_ files written by the same asyncbench run as ``path``."""
+    dirname, name = os.path.split(path)
+    if not name.startswith("results_"):
+        return []
+    run = name.removeprefix("results_")
+    out = []
+    for prefix in SIBLING_PREFIXES:
+        candidate = os.path.join(dirname, prefix + run)
+        if os.path.isfile(candidate):
+            out.append(candidate)
+    return out
+
+
+class HostClock:
+    """Fitted mapping from one host's local realtime stamps to fleet time."""
+
+    def __init__(self, clock):
+        samples = sorted(clock["samples"], key=lambda s: s["monotonic"])
+        self.host = clock["host"]
+        self.mono = np.array([s["monotonic"] for s in samples])
+        self.real = np.array([s["realtime"] for s in samples])
+        # Searching on the running maximum keeps lookups defined after a
+        # backwards step; stamps inside the repeated interval are ambiguous
+        self._real_search = np.maximum.accumulate(self.real)
+
+        ref = [s for s in samples if "ref_offset" in s]
+        self.referenced = len(ref) > 0
+        if self.referenced:
+            rtt = np.array([s["ref_rtt"] for s in ref])
+            keep = rtt <= max(2 * rtt.min(), rtt.min() + RTT_SLACK)
+            x = np.array([s["monotonic"] for s in ref])[keep]
+            y = np.array([s["realtime"] + s["ref_offset"] - s["monotonic"] for s in ref])[keep]
+            w = 1 / np.maximum(rtt[keep], 1e-6)
+        else:
+            # No external reference: drift is unobservable and a linear fit
+            # would smear any step into it, so anchor at the last sample,
+            # by which time NTP has had longest to converge
+            x, y, w = self.mono[-1:], self.real[-1:] - self.mono[-1:], np.ones(1)
+        self.m0 = x[0]
+        if len(x) >= 2 and np.ptp(x) > 0:
+            self.drift, self.offset = np.polyfit(x - self.m0, y, 1, w=w)
+        else:
+            self.drift, self.offset = 0.0, float(np.average(y, weights=w))
+        self.residual = float(np.std(y - self.offset - self.drift * (x - self.m0)))
+        if not self.referenced:
+            self.residual = float(np.std(self.real - self.mono - self.offset))
+
+        jumps = np.diff(self.real - self.mono)
+        self.steps = [float(j) for j in jumps if abs(j) > STEP_THRESHOLD]
+
+    def to_monotonic(self, t):
+        t = np.asarray(t, dtype=np.float64)
+        i = np.clip(np.searchsorted(self._real_search, t, side="right") - 1, 0, len(self.real) - 1)
+        return self.mono[i] + (t - self.real[i])
+
+    def align(self, t):
+        """Local realtime stamps -> fleet time."""
+        m = self.to_monotonic(t)
+        return m + self.offset + self.drift * (m - self.m0)
+
+    def summary(self):
+        mid = self.real[len(self.real) // 2]
+        return {
+            "host": self.host,
+            "referenced": self.referenced,
+            "samples": len(self.real),
+            # Correction applied to a stamp in the middle of the run
+            "offset_s": float(self.align(mid) - mid),
+            "drift_ppm": float(self.drift * 1e6),
+            "residual_ms": self.residual * 1000,
+            "steps_s": self.steps,
+        }
+
+
+def host_key(host, seen):
+    """Hostname, disambiguated by machine id if two machines share it."""
+    name = host["hostname"]
+    machine = host.get("machine_id") or host.get("boot_id") or ""
+    other = seen.setdefault(name, machine)
+    return name if other == machine else f"{name}-{machine[:8]}"
+
+
+def restamp(records, clock):
+    if not records or not isinstance(records, list):
+        return records
+    t = clock.align([r["timestamp"] for r in records])
+    for r, ts in zip(records, t.tolist()):
+        r["timestamp"] = ts
+    return records
+
+
+def binned(t, y, edges):
+    """Mean of ``y`` per grid cell, NaN where there is no sample."""
+    idx = np.searchsorted(edges, t, side="right") - 1
+    ok = (idx >= 0) & (idx < len(edges) - 1) & ~np.isnan(y)
+    n = np.bincount(idx[ok], minlength=len(edges) - 1)
+    s = np.bincount(idx[ok], weights=y[ok], minlength=len(edges) - 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, s / n, np.nan)
+
+
+def merge_rates(series, step):
+    """Sum per-host rate series on a common ``step``-second grid."""
+    if not series:
+        return []
+    start = min(s["t"][0] for s in series)
+    end = max(s["t"][-1] for s in series)
+    edges = np.arange(start, end + step, step)
+    keys = RATE_KEYS
+    # -1 marks a failed probe and unknown container counts are already NaN;
+    # leave both out of the means
+    grids = {
+        k: np.array([binned(s["t"], np.where(s[k] < 0, np.nan, s[k]), edges) for s in series])
+        for k in keys
+    }
+    lat = grids["busctl_latency"]
+    # Stats-collector hosts report daemon reads instead of messages; the two
+    # are summed separately and a cell no host reported is None, not 0
+    rates = {k: grids[k] for k in ("avg_msgs_per_sec", "daemon_reads_per_sec")}
+    has_rate = {k: ~np.isnan(g) for k, g in rates.items()}
+    reporting = np.sum(has_rate["avg_msgs_per_sec"] | has_rate["daemon_reads_per_sec"], axis=0)
+    with warnings.catch_warnings():
+        # Cells where no host has a latency sample stay NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        merged = {
+            **{k: np.where(has_rate[k].any(axis=0), np.nansum(g, axis=0), np.nan)
+               for k, g in rates.items()},
+            "num_containers": np.nansum(grids["num_containers"], axis=0),
+            "busctl_latency": np.nanmean(lat, axis=0),
+        }
+    out = []
+    for i in np.flatnonzero(reporting):
+        lat_i = merged["busctl_latency"][i]
+        out.append({
+            "timestamp": float(edges[i]),
+            **{k: None if np.isnan(merged[k][i]) else float(merged[k][i]) for k in rates},
+            "num_containers": float(merged["num_containers"][i]),
+            "busctl_latency": -1.0 if np.isnan(lat_i) else float(lat_i),
+            "hosts": int(reporting[i]),
+        })
+    return out
+
+
+def histogram(values):
+    values = np.asarray(values, dtype=np.float64)
+    counts = np.bincount(np.searchsorted(LATENCY_BUCKETS, values, side="left"),
+                         minlength=len(LATENCY_BUCKETS) + 1)
+    pct = np.percentile(values, PERCENTILES) if values.size else [np.nan] * len(PERCENTILES)
+    return {
+        "samples": int(values.size),
+        "buckets": [*LATENCY_BUCKETS, "+Inf"],
+        "counts": counts.tolist(),
+        **{f"p{p}_ms": float(v) * 1000 for p, v in zip(PERCENTILES, pct)},
+    }
+
+
+def merge(paths, out_dir, step=1.0):
+    files = discover(paths)
+    if not files:
+        raise SystemExit(f"no results with {CLOCK_SUFFIX} sidecars under {' '.join(paths)}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    seen = {}
+    alignment = []
+    rate_series = []
+    latencies = {}
+    probes = []
+    for path in files:
+        with open(path + CLOCK_SUFFIX) as f:
+            clock = HostClock(json.load(f))
+        host = host_key(clock.host, seen)
+        alignment.append({"file": path, "key": host, **clock.summary()})
+
+        host_dir = os.path.join(out_dir, "aligned", host)
+        os.makedirs(host_dir, exist_ok=True)
+        for src in [path, *siblings(path)]:
+            with open(src) as f:
+                data = restamp(json.load(f), clock)
+            with open(os.path.join(host_dir, os.path.basename(src)), "w") as f:
+                json.dump(data, f)
+            if src != path:
+                continue
+            kind = classify(data)
+            if kind in ("asyncbench", "measure"):
+                t = np.array([r["timestamp"] for r in data])
+                rate_series.append({
+                    "t": t,
+                    **{k: np.array([r.get(k, np.nan) for r in data], dtype=np.float64)
+                       for k in RATE_KEYS},
+                })
+                lat = [r["busctl_latency"] for r in data if r.get("busctl_latency", -1) >= 0]
+                latencies.setdefault(host, []).extend(lat)
+            elif kind == "probe":
+                latencies.setdefault(host, []).extend(r["latency"] for r in data)
+                probes.extend(
+                    {"timestamp": r["timestamp"], "latency": r["latency"], "host": host}
+                    for r in data
+                )
+
+    rates = merge_rates(rate_series, step)
+    probes.sort(key=lambda r: r["timestamp"])
+    hist = {host: histogram(v) for host, v in latencies.items()}
+    hist["fleet"] = histogram([x for v in latencies.values() for x in v])
+
+    for name, obj in (
+        ("alignment.json", alignment),
+        ("rates.json", rates),
+        ("probes.json", probes),
+        ("latency_hist.json", hist),
+    ):
+        with open(os.path.join(out_dir, name), "w") as f:
+            json.dump(obj, f, indent=2)
+    return alignment, rates, probes, hist
+
+
+def synthesize(directory, hosts=3, duration=600.0, seed=0, interval=10.0):
+    """
+    Write skewed per-host results (asyncbench rates + probe latencies) for a
+    shared load pattern, with known clock offsets, drifts and one NTP step.
+    Returns the true parameters per host.
+    """
+    rng = np.random.default_rng(seed)
+    fleet0 = 1_700_000_000.0
+    truth = {}
+    for h in range(hosts):
+        name = f"host{h}"
+        offset = rng.uniform(-2.0, 2.0)
+        drift = rng.uniform(-50e-6, 50e-6)
+        mono0 = rng.uniform(1e3, 1e5)
+        # host0 has no reference server and gets stepped halfway through
+        referenced = h > 0
+        step_at, step = (duration / 2, -0.5) if h == 0 else (np.inf, 0.0)
+
+        def mono(f):
+            return mono0 + (f - fleet0) * (1 + drift)
+
+        def real(f):
+            m = mono(f)
+            return m + fleet0 + offset - mono0 + np.where(f - fleet0 >= step_at, step, 0.0)
+
+        host_dir = os.path.join(directory, name)
+        os.makedirs(host_dir, exist_ok=True)
+        samples = []
+        for f in fleet0 + np.arange(0, duration + interval, interval):
+            s = {"monotonic": float(mono(f)), "realtime": float(real(f)), "uncertainty": 1e-7}
+            if referenced:
+                rtt = 0.0002 + rng.exponential(0.0005)
+                s["ref_offset"] = float(f - real(f) + rng.normal(0, rtt / 10))
+                s["ref_rtt"] = float(rtt)
+            samples.append(s)
+        clock = {
+            "host": {"hostname": name, "boot_id": f"boot-{h}", "machine_id": f"machine-{h}"},
+            "reference": "ref:12321" if referenced else None,
+            "samples": samples,
+        }
+
+        # Containers ramp up together on every host; bus rate follows
+        tick = fleet0 + np.arange(0, duration, 0.1)
+        containers = np.floor((tick - fleet0) / duration * 20)
+        rate = 50 + 30 * containers + rng.normal(0, 5, tick.size)
+        latency = 0.005 + 0.001 * containers + rng.exponential(0.002, tick.size)
+        results = [
+            {"timestamp": float(t), "avg_msgs_per_sec": float(r),
+             "num_containers": float(c), "busctl_latency": float(lat)}
+            for t, r, c, lat in zip(real(tick), rate, containers, latency)
+        ]
+        probe_t = fleet0 + np.arange(0, duration, 1.0)
+        probe = [
+            {"timestamp": float(t), "latency": float(lat)}
+            for t, lat in zip(real(probe_t), 0.004 + rng.exponential(0.003, probe_t.size))
+        ]
+        for filename, data in (("results_synth.json", results), ("probe_synth.json", probe)):
+            path = os.path.join(host_dir, filename)
+            with open(path, "w") as f:
+                json.dump(data, f)
+            with open(path + CLOCK_SUFFIX, "w") as f:
+                json.dump(clock, f)
+        # Same sign convention as alignment.json: the correction to apply
+        mid = fleet0 + duration / 2 - interval
+        truth[name] = {"offset_s": float(mid - real(mid)), "drift_ppm": -drift * 1e6,
+                       "referenced": referenced, "step_s": step}
+    with open(os.path.join(directory, "truth.json"), "w") as f:
+        json.dump(truth, f, indent=2)
+    return truth
+
+
+def cli(argv=None, prog=None, defaults=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Merge multi-host results")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("merge", help="align and merge per-host results")
+    p.add_argument("paths", nargs="+", help="results files or directories to search")
+    p.add_argument("--out", default="fleet")
+    p.add_argument("--step", type=float, default=1.0, help="rate grid in seconds")
+    p = sub.add_parser("synth", help="write synthetic skewed per-host results")
+    p.add_argument("directory")
+    p.add_argument("--hosts", type=int, default=3)
+    p.add_argument("--duration", type=float, default=600.0)
+    p.add_argument("--seed", type=int, default=0)
+    config.apply_defaults(parser, defaults)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "synth":
+        truth = synthesize(args.directory, args.hosts, args.duration, args.seed)
+        for name, t in truth.items():
+            print(f"{name}: offset {t['offset_s']:+.4f} s, drift {t['drift_ppm']:+.2f} ppm, "
+                  f"step {t['step_s']:+.3f} s, referenced {t['referenced']}")
+    else:
+        alignment, rates, probes, hist = merge(args.paths, args.out, args.step)
+        for a in alignment:
+            flag = "" if a["referenced"] else "  (no reference: NTP-relative only)"
+            print(f"{a['key']:20s} {os.path.basename(a['file']):28s} "
+                  f"offset {a['offset_s']:+.4f} s  drift {a['drift_ppm']:+8.2f} ppm  "
+                  f"residual {a['residual_ms']:.3f} ms  steps {len(a['steps_s'])}{flag}")
+        fleet = hist["fleet"]
+        print(f">>> {len(rates)} rate points, {len(probes)} probes; fleet latency "
+              + ", ".join(f"p{p} {fleet[f'p{p}_ms']:.2f} ms" for p in PERCENTILES))
+        print(f">>> Wrote {args.out}/")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,227 @@
+"""
+Attribute D-Bus traffic and probe latency to container start/stop events.
+
+Lines up the container-count series from an asyncbench results file (or an
+orchestrator event log) with the matching bus log, detects start/stop events,
+and reports per run how many messages and bytes each container start costs,
+broken down by interface/member, plus the latency added per container.
+
+Usage: dbusbench lifecycle <RESULTS FILE> <BUS FILE> [<RESULTS FILE> <BUS FILE> ...]
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dbusbench import busstore
+from dbusbench import config
+
+# Events are detected from the container count, which asyncbench refreshes
+# once a second, so the burst that caused a change can precede it by a tick.
+PRE_WINDOW = 1.0
+POST_WINDOW = 2.0
+
+
+def load_results(filename):
+    # Keep epoch-second timestamps as floats; read_json would make them datetimes
+    df = pd.read_json(filename, convert_dates=False)
+    return df.sort_values("timestamp", ignore_index=True)
+
+
+def load_bus(filename):
+    store = busstore.MessageStore.load_json(filename)
+    df = store.to_dataframe()[["timestamp", "interface", "member", "payload_size"]]
+    # Serialized payload length is the best proxy we have for message size
+    df = df.rename(columns={"payload_size": "bytes"})
+    for field in ("interface", "member"):
+        if "" not in df[field].cat.categories:
+            df[field] = df[field].cat.add_categories([""])
+        df[field] = df[field].fillna("")
+    return df.sort_values("timestamp", ignore_index=True)
+
+
+def detect_events(results):
+    """Turn the sampled container count into (timestamp, kind, containers) events."""
+    # Unknown counts (None in the file, so NaN here: not counted yet or a
+    # failed count) are skipped; the first real reading is the baseline, not a start
+    valid = results[results["num_containers"] >= 0]
+    t = valid["timestamp"].to_numpy()
+    n = valid["num_containers"].to_numpy().astype(np.int64)
+    delta = np.diff(n, prepend=n[:1])
+    idx = np.flatnonzero(delta)
+    return pd.DataFrame({
+        "timestamp": t[idx],
+        "kind": np.where(delta[idx] > 0, "start", "stop"),
+        "containers": np.abs(delta[idx]),
+    })
+
+
+def load_events(filename):
+    """Orchestrator log: a JSON list of {"timestamp", "event": "start"|"stop"}."""
+    df = pd.read_json(filename, convert_dates=False)
+    df = df.rename(columns={"event": "kind"})
+    df["containers"] = 1
+    return df[["timestamp", "kind", "containers"]].sort_values(
+        "timestamp", ignore_index=True
+    )
+
+
+def attribute(events, bus, pre=PRE_WINDOW, post=POST_WINDOW):
+    """
+    Windowed as-of join: each message goes to the latest event whose window
+    [t - pre, t + post) contains it, or -1 (background) if there is none.
+    """
+    starts = events["timestamp"].to_numpy() - pre
+    ts = bus["timestamp"].to_numpy()
+    idx = np.searchsorted(starts, ts, side="right") - 1
+    inside = idx >= 0
+    inside[inside] = ts[inside] < starts[idx[inside]] + pre + post
+    return np.where(inside, idx, -1)
+
+
+def exposure(events, bus, pre=PRE_WINDOW, post=POST_WINDOW):
+    """
+    Seconds of bus log owned by each event under attribute()'s rule: an
+    event's window runs until the next event's window starts, so overlapping
+    windows are counted once, and everything is clipped to the log's span.
+    """
+    if len(bus) == 0 or len(events) == 0:
+        return np.zeros(len(events))
+    first, last = bus["timestamp"].iloc[0], bus["timestamp"].iloc[-1]
+    starts = events["timestamp"].to_numpy() - pre
+    ends = np.minimum(starts + pre + post, np.append(starts[1:], np.inf))
+    return np.clip(ends, first, last) - np.clip(starts, first, last)
+
+
+def idle_seconds(events, bus, pre=PRE_WINDOW, post=POST_WINDOW):
+    """Time covered by the bus log but by no event window."""
+    if len(bus) == 0:
+        return 0.0
+    span = bus["timestamp"].iloc[-1] - bus["timestamp"].iloc[0]
+    return max(span - exposure(events, bus, pre, post).sum(), 1e-9)
+
+
+def latency_per_container(results):
+    """Slope of probe latency against running containers (seconds/container)."""
+    ok = (results["busctl_latency"] >= 0) & (results["num_containers"] >= 0)
+    n = results.loc[ok, "num_containers"].to_numpy()
+    lat = results.loc[ok, "busctl_latency"].to_numpy()
+    if len(n) < 2 or np.ptp(n) == 0:
+        return float("nan")
+    return float(np.polyfit(n, lat, 1)[0])
+
+
+def analyze_run(results, bus, events=None, pre=PRE_WINDOW, post=POST_WINDOW):
+    if events is None:
+        events = detect_events(results)
+    owner = attribute(events, bus, pre, post)
+    owned = exposure(events, bus, pre, post)
+
+    # Background traffic rates, overall and per member, from outside all windows
+    idle = idle_seconds(events, bus, pre, post)
+    background = bus[owner < 0]
+    bg_msgs = len(background) / idle
+    bg_bytes = background["bytes"].sum() / idle
+    bg_by_member = background.groupby(["interface", "member"], observed=True).size() / idle
+
+    bus = bus.assign(event=owner)
+    attributed = bus[owner >= 0].join(events[["kind"]], on="event")
+
+    report = {"background_msgs_per_sec": bg_msgs, "background_bytes_per_sec": bg_bytes}
+    for kind in ("start", "stop"):
+        is_kind = (events["kind"] == kind).to_numpy()
+        ev = events[is_kind]
+        containers = int(ev["containers"].sum())
+        msgs = attributed[attributed["kind"] == kind]
+        # Subtract the traffic we'd have seen anyway in the time these events own
+        seconds = owned[is_kind].sum()
+        excess_msgs = len(msgs) - bg_msgs * seconds
+        excess_bytes = msgs["bytes"].sum() - bg_bytes * seconds
+        by_member = msgs.groupby(["interface", "member"], observed=True).size()
+        by_member = by_member.sub(
+            bg_by_member.reindex(by_member.index, fill_value=0) * seconds
+        ).sort_values(ascending=False)
+        report[kind] = {
+            "events": len(ev),
+            "containers": containers,
+            "msgs_per_container": excess_msgs / containers if containers else None,
+            "bytes_per_container": excess_bytes / containers if containers else None,
+            "msgs_per_container_by_member": {
+                f"{iface}.{member}": n / containers
+                for (iface, member), n in by_member.items()
+            } if containers else {},
+        }
+
+    if "busctl_latency" in results:
+        # Probe latency inside start windows vs. outside any window
+        ok = results["busctl_latency"] >= 0
+        lat_owner = attribute(events, results[ok], pre, post)
+        lat = results.loc[ok, "busctl_latency"].to_numpy()
+        in_start = lat_owner >= 0
+        in_start[in_start] = events["kind"].to_numpy()[lat_owner[in_start]] == "start"
+        quiet = lat_owner < 0
+        report["latency_delta_in_start_windows"] = (
+            float(lat[in_start].mean() - lat[quiet].mean())
+            if in_start.any() and quiet.any() else None
+        )
+        report["latency_per_container"] = latency_per_container(results)
+    return report
+
+
+def print_report(name, report):
+    print(f"== {name}")
+    print(f"  background: {report['background_msgs_per_sec']:.1f} msgs/s, "
+          f"{report['background_bytes_per_sec']:.0f} B/s")
+    for kind in ("start", "stop"):
+        r = report[kind]
+        if not r["containers"]:
+            continue
+        print(f"  {kind}: {r['containers']} containers in {r['events']} events, "
+              f"{r['msgs_per_container']:.1f} msgs/container, "
+              f"{r['bytes_per_container']:.0f} B/container")
+        for key, n in list(r["msgs_per_container_by_member"].items())[:10]:
+            print(f"    {n:8.2f}  {key}")
+    if report.get("latency_per_container") is not None:
+        print(f"  latency: {report['latency_per_container'] * 1000:.3f} ms/container")
+    if report.get("latency_delta_in_start_windows") is not None:
+        print(f"  latency in start windows: "
+              f"{report['latency_delta_in_start_windows'] * 1000:+.3f} ms vs. quiet")
+
+
+def cli(argv=None, prog=None, defaults=None):
+    parser = argparse.ArgumentParser(prog=prog, description=__doc__.split("\n\n")[0])
+    parser.add_argument("files", nargs="+", help="pairs of results and bus files")
+    parser.add_argument("--events", nargs="*", help="orchestrator event log per run")
+    parser.add_argument("--pre", type=float, default=PRE_WINDOW)
+    parser.add_argument("--post", type=float, default=POST_WINDOW)
+    parser.add_argument("--out", help="write the per-run report as JSON")
+    config.apply_defaults(parser, defaults)
+    args = parser.parse_args(argv)
+
+    if len(args.files) % 2:
+        parser.error("expected <RESULTS FILE> <BUS FILE> pairs")
+    pairs = list(zip(args.files[::2], args.files[1::2]))
+    if args.events and len(args.events) != len(pairs):
+        parser.error(f"--events needs one event log per run ({len(pairs)}), got {len(args.events)}")
+
+    reports = {}
+    for i, (results_file, bus_file) in enumerate(pairs):
+        events = load_events(args.events[i]) if args.events else None
+        report = analyze_run(
+            load_results(results_file), load_bus(bus_file), events, args.pre, args.post
+        )
+        name = os.path.basename(results_file)
+        reports[name] = report
+        print_report(name, report)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    cli()
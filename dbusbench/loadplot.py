@@ -0,0 +1,98 @@
+import matplotlib.pyplot as plt
+from datetime import datetime
+import json
+import os
+import sys
+
+import numpy as np
+
+from dbusbench.simulation import curve
+
+d = "{:%Y%m%d_%H%M%S}".format(datetime.now())
+OUTFILE = f"plot_load_{d}.png"
+DPI = 150
+
+
+def columns(data):
+    """Per-phase curve of a simulation.py result as float64 arrays."""
+    quantile = data.get("slo", {}).get("quantile", 99)
+    points = curve(data["phases"], quantile)
+    ci = [p.get("quantile_ci_ms") or (np.nan, np.nan) for p in points]
+    return {
+        "offered_rate": np.array([p["offered_rate"] or np.nan for p in points], dtype=np.float64),
+        "achieved_rate": np.array([p["achieved_rate"] for p in points], dtype=np.float64),
+        "p50_ms": np.array([p["p50_ms"] for p in points], dtype=np.float64),
+        "tail_ms": np.array([p[f"p{quantile:g}_ms"] for p in points], dtype=np.float64),
+        "ci_lo_ms": np.array([c[0] for c in ci], dtype=np.float64),
+        "ci_hi_ms": np.array([c[1] for c in ci], dtype=np.float64),
+        "passed": np.array([p.get("verdict") != "fail" for p in points]),
+        "concurrency": np.array([p.get("concurrency", np.nan) for p in points], dtype=np.float64),
+        "quantile": np.float64(quantile),
+        "slo_ms": np.float64(data.get("slo", {}).get("latency_ms", np.nan)),
+        "knee_rate": np.float64(data.get("knee_rate") or np.nan),
+        # Nothing failed up to --max-rate: the knee is only a lower bound
+        "knee_censored": np.bool_(data.get("knee_censored", False)),
+        # Where the knee sits on the achieved-throughput axis
+        "knee_achieved": np.float64(next(
+            (p["achieved_rate"] for p in points if p["offered_rate"] == data.get("knee_rate")),
+            np.nan,
+        )),
+    }
+
+
+def plot_columns(runs, outfile=OUTFILE):
+    """Latency vs achieved throughput for each (label, columns) run."""
+    fig, ax = plt.subplots(figsize=(19.20, 10.80))
+    for i, (label, cols) in enumerate(runs):
+        color = f"C{i}"
+        order = np.argsort(cols["achieved_rate"])
+        x = cols["achieved_rate"][order]
+        q = f"p{float(cols['quantile']):g}"
+        ax.plot(x, cols["p50_ms"][order], linestyle="--", marker=".", color=color,
+                label=f"{label} p50")
+        tail = cols["tail_ms"][order]
+        err = np.abs(np.vstack([tail - cols["ci_lo_ms"][order], cols["ci_hi_ms"][order] - tail]))
+        ax.errorbar(x, tail, yerr=np.nan_to_num(err), marker="o", color=color, capsize=3,
+                    label=f"{label} {q}")
+        # Closed-loop phases: label each point with its client count
+        for xi, yi, n in zip(x, tail, cols["concurrency"][order]):
+            if not np.isnan(n):
+                ax.annotate(f"N={n:g}", (xi, yi), textcoords="offset points", xytext=(4, 6),
+                            color=color, fontsize=8)
+        failed = ~cols["passed"][order]
+        ax.scatter(x[failed], tail[failed], marker="x", s=80, color="black", zorder=3,
+                   label="Failed SLO" if i == 0 and failed.any() else None)
+        if not np.isnan(cols["slo_ms"]):
+            ax.axhline(cols["slo_ms"], color=color, linestyle=":",
+                       label=f"{label} SLO {q} {float(cols['slo_ms']):g} ms")
+        if not np.isnan(cols["knee_achieved"]) and cols["knee_censored"]:
+            ax.axvline(cols["knee_achieved"], color=color, linestyle=":", alpha=0.6,
+                       label=f"{label} knee >= {float(cols['knee_rate']):g} msgs/sec offered "
+                       "(no failure up to max rate)")
+            ax.annotate("", xy=(1.0, 0.9), xycoords=("axes fraction", "axes fraction"),
+                        xytext=(cols["knee_achieved"], 0.9),
+                        textcoords=("data", "axes fraction"),
+                        arrowprops=dict(arrowstyle="->", color=color, linestyle=":"))
+        elif not np.isnan(cols["knee_achieved"]):
+            ax.axvline(cols["knee_achieved"], color=color, linestyle="-.",
+                       label=f"{label} knee {float(cols['knee_rate']):g} msgs/sec offered")
+
+    ax.set_xlabel("Achieved throughput (calls/sec)")
+    ax.set_ylabel("Latency (ms)")
+    ax.set_yscale("log")
+    ax.grid(True, which="both", alpha=0.3)
+    ax.legend()
+    plt.title("D-Bus Call Latency vs. Throughput")
+    fig.tight_layout()
+    plt.savefig(outfile, dpi=DPI, bbox_inches="tight")
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    # Usage: loadplot.py <dbus_load FILE> [...]; runs are overlaid
+    runs = []
+    for filename in sys.argv[1:]:
+        with open(filename) as f:
+            runs.append((os.path.basename(filename), columns(json.load(f))))
+    plot_columns(runs)
+    print(f"Wrote {OUTFILE}")
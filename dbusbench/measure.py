@@ -3,7 +3,8 @@ import time
 from collections import deque
 import datetime
 import json
-import matplotlib.pyplot as plt
+
+from dbusbench import raster
 
 
 def num_containers():
@@ -68,24 +69,32 @@ def monitor_dbus(duration=1000):  # 16 min
         return data_log
 
 
-def save_results_and_plot(results):
-    # Extract data
-    times = [datetime.datetime.fromtimestamp(entry["timestamp"]) for entry in results]
-    avgs = [entry["avg_msgs_per_sec"] for entry in results]
-    containers = [entry["num_containers"] for entry in results]
+COLUMNS = ["timestamp", "avg_msgs_per_sec", "num_containers"]
+
+
+def plot_columns(cols, plot_filename):
+    import matplotlib.pyplot as plt
+
+    times = cols["timestamp"]
 
     # Create dual-axis plot
     fig, ax1 = plt.subplots()
     fig.set_size_inches(19.20, 10.80)
+    nbins = raster.pixel_width(fig, 100)
 
     ax1.set_xlabel("Time")
     ax1.set_ylabel("Messages/sec", color="tab:blue")
-    ax1.plot(times, avgs, label="D-Bus Msg/sec", color="tab:blue")
+    raster.plot_envelope(
+        ax1, times, cols["avg_msgs_per_sec"], nbins, "tab:blue", "D-Bus Msg/sec"
+    )
     ax1.tick_params(axis="y", labelcolor="tab:blue")
+    ax1.xaxis_date()
 
     ax2 = ax1.twinx()
     ax2.set_ylabel("runsc-sandbox Processes", color="tab:red")
-    ax2.plot(times, containers, label="runsc-sandbox count", color="tab:red")
+    raster.plot_envelope(
+        ax2, times, cols["num_containers"], nbins, "tab:red", "runsc-sandbox count"
+    )
     ax2.tick_params(axis="y", labelcolor="tab:red")
 
     plt.title("D-Bus Message Rate vs. runsc-sandbox Process Count")
@@ -93,12 +102,17 @@ def save_results_and_plot(results):
     plt.grid(True)
     fig.tight_layout()
 
+    plt.savefig(plot_filename, dpi=100)
+    plt.close(fig)
+
+
+def save_results_and_plot(results):
     # Timestamp for filenames
     timestamp_str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    # Save plot
+    # Extract data as epoch-float columns and save plot
     plot_filename = f"dbus_dual_plot_{timestamp_str}.png"
-    plt.savefig(plot_filename, dpi=100)
+    plot_columns(raster.columns(results, COLUMNS), plot_filename)
     print(f"Plot saved to {plot_filename}")
 
     # Save data as JSON
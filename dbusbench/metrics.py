@@ -0,0 +1,191 @@
+"""
+Embedded OpenMetrics exporter for the collectors.
+
+Metrics are pre-aggregated as samples arrive and each one keeps its rendered
+exposition text cached, so a scrape only re-renders the series that changed
+since the previous scrape and otherwise just joins bytes. The HTTP endpoint
+runs on the caller's asyncio loop; serving a scrape never blocks the
+monitor's read loop for more than the join.
+"""
+
+import asyncio
+import bisect
+import math
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Buckets (seconds) tuned for busctl round trips: ~1ms idle, 100ms+ under load
+LATENCY_BUCKETS = (
+    0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0,
+)
+
+
+def _escape(value):
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+def _fmt(value):
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type = "unknown"
+
+    def __init__(self, name, help, label=None):
+        self.name = name
+        self.label = label
+        self._header = f"# TYPE {name} {self.type}\n# HELP {name} {help}\n".encode()
+        self._lines = {}
+        self._dirty = set()
+
+    def _render_line(self, key):
+        raise NotImplementedError
+
+    def render(self):
+        for key in self._dirty:
+            self._lines[key] = self._render_line(key)
+        self._dirty.clear()
+        return self._header + b"".join(self._lines.values())
+
+    def _labels(self, key):
+        if self.label is None:
+            return ""
+        return f'{{{self.label}="{_escape(key)}"}}'
+
+
+class Counter(_Metric):
+    """Monotonic counter, optionally split by a single label."""
+
+    type = "counter"
+
+    def __init__(self, name, help, label=None):
+        super().__init__(name, help, label)
+        self.values = {}
+        if label is None:
+            self.values[None] = 0
+            self._dirty.add(None)
+
+    def inc(self, amount=1, key=None):
+        self.values[key] = self.values.get(key, 0) + amount
+        self._dirty.add(key)
+
+    def _render_line(self, key):
+        value = self.values[key]
+        return f"{self.name}_total{self._labels(key)} {_fmt(value)}\n".encode()
+
+
+class Gauge(_Metric):
+    """Last-value gauge."""
+
+    type = "gauge"
+
+    def __init__(self, name, help, label=None):
+        super().__init__(name, help, label)
+        self.values = {}
+        if label is None:
+            self.set(0)
+
+    def set(self, value, key=None):
+        if self.values.get(key) != value:
+            self.values[key] = value
+            self._dirty.add(key)
+
+    def _render_line(self, key):
+        value = self.values[key]
+        return f"{self.name}{self._labels(key)} {_fmt(value)}\n".encode()
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; observe() is a bisect and two additions."""
+
+    type = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.bounds = list(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._dirty.add(None)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        self._dirty.add(None)
+
+    def _render_line(self, key):
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.bounds + [math.inf], self.counts):
+            cumulative += n
+            lines.append(f'{self.name}_bucket{{le="{_fmt(bound)}"}} {cumulative}\n')
+        lines.append(f"{self.name}_count {self.count}\n")
+        lines.append(f"{self.name}_sum {_fmt(self.sum)}\n")
+        return "".join(lines).encode()
+
+
+class Registry:
+    """Ordered set of metrics rendered together for one scrape."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, label=None):
+        return self.add(Counter(name, help, label))
+
+    def gauge(self, name, help, label=None):
+        return self.add(Gauge(name, help, label))
+
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS):
+        return self.add(Histogram(name, help, buckets))
+
+    def render(self):
+        return b"".join(m.render() for m in self.metrics) + b"# EOF\n"
+
+
+async def _handle(registry, reader, writer):
+    try:
+        request = await reader.readline()
+        # Drain headers; we don't care about any of them
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request.split()
+        if len(parts) >= 2 and parts[1].split(b"?")[0] == b"/metrics":
+            body = registry.render()
+            status = b"200 OK"
+            ctype = CONTENT_TYPE.encode()
+        else:
+            body = b"not found\n"
+            status = b"404 Not Found"
+            ctype = b"text/plain"
+        writer.write(
+            b"HTTP/1.1 " + status + b"\r\n"
+            b"Content-Type: " + ctype + b"\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+            b"Connection: close\r\n\r\n" + body
+        )
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(registry, port, host="0.0.0.0"):
+    """Start serving ``registry`` at http://host:port/metrics on the running loop."""
+    server = await asyncio.start_server(
+        lambda r, w: _handle(registry, r, w), host, port
+    )
+    print(f">>> Serving OpenMetrics on http://{host}:{port}/metrics")
+    return server
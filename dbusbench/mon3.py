@@ -8,31 +8,45 @@ import asyncio
 import time
 import random
 import signal
+import argparse
 import json
-import sys
 
-# Generate timestamped output filename
-# d = "{:%Y%m%d_%H%M%S}".format(datetime.now())
-OUTPUT_FILE = sys.argv[1]
+from dbusbench import clocksync
+from dbusbench import config
+from dbusbench import procstat
+from dbusbench import selfstat
 
 
 class DBusMonitor:
     """Monitor D-Bus operations and measure latency."""
     
-    def __init__(self):
+    def __init__(self, registry=None, proc_sampler=None):
         self.latencies = dict()
         self.running_tasks = set()
+        self.loop_lag = selfstat.LoopLag(interval=1)
+        self.self_sampler = selfstat.SelfSampler(self.loop_lag)
+        self.proc_sampler = proc_sampler
+        self.self_samples = dict()
+        self.latency_hist = None
+        self.probe_counter = None
+        if registry is not None:
+            self.latency_hist = registry.histogram(
+                "probe_latency_seconds", "busctl get-property probe latency"
+            )
+            self.probe_counter = registry.counter(
+                "probes_started", "Probes launched by the monitoring loop"
+            )
         
-    async def _run_measurement(self, task_id):
+    async def _run_measurement(self, task_id, self_sample):
         """Wrapper to run a measurement and handle task cleanup."""
         current_task = asyncio.current_task()
         try:
-            return await self.measure_busctl_latency(task_id)
+            return await self.measure_busctl_latency(task_id, self_sample)
         finally:
             # Remove this task from the running tasks set when it completes
             self.running_tasks.discard(current_task)
 
-    async def measure_busctl_latency(self, task_id):
+    async def measure_busctl_latency(self, task_id, self_sample=None):
         """Measure latency of a single busctl command."""
         cmd = [
             "busctl", "get-property", 
@@ -51,6 +65,10 @@ class DBusMonitor:
         
         # Store result and print when this specific task completes
         self.latencies[start_time] = latency
+        if self_sample is not None:
+            self.self_samples[start_time] = self_sample
+        if self.latency_hist is not None:
+            self.latency_hist.observe(latency)
         print(f"[{start_time}] {latency:.6f} (task {task_id})")
         
         return latency
@@ -58,16 +76,25 @@ class DBusMonitor:
     async def run_monitoring_loop(self, shutdown_event):
         """Main monitoring loop that starts a new measurement every second."""
         task_id = 0
+        loop = asyncio.get_running_loop()
         
         try:
             while not shutdown_event.is_set():
                 # Start a new measurement task without waiting for it to complete
                 task_id += 1
-                task = asyncio.create_task(self._run_measurement(task_id))
+                self_sample = self.self_sampler.sample()
+                if self.proc_sampler is not None:
+                    self_sample.update(self.proc_sampler.sample())
+                task = asyncio.create_task(self._run_measurement(task_id, self_sample))
                 self.running_tasks.add(task)
+                if self.probe_counter is not None:
+                    self.probe_counter.inc()
                 
-                # Sleep for exactly 1 second before starting the next measurement
+                # Sleep for exactly 1 second before starting the next measurement;
+                # how late we wake up is our own scheduling lag
+                expected = loop.time() + 1
                 await asyncio.sleep(1)
+                self.loop_lag.record(loop.time() - expected)
                 
         finally:
             await self.shutdown_gracefully()
@@ -83,9 +110,22 @@ class DBusMonitor:
         print(">>> All tasks completed. Cleanup finished.")
 
 
-async def main():
+async def main(output_file, metrics_port=None, reference_clock=None, proc_targets=None):
     """Main entry point."""
-    monitor = DBusMonitor()
+    registry = None
+    server = None
+    if metrics_port is not None:
+        from dbusbench import metrics
+
+        registry = metrics.Registry()
+        server = await metrics.serve(registry, metrics_port)
+
+    # proc_targets: None for the default processes, {} to sample none
+    proc_sampler = procstat.ProcSampler(proc_targets) if proc_targets != {} else None
+    monitor = DBusMonitor(registry, proc_sampler)
+    clock = clocksync.ClockLog(reference_clock)
+    clock_task = asyncio.create_task(clock.run())
+    proc_task = asyncio.create_task(proc_sampler.run()) if proc_sampler is not None else None
     shutdown_event = asyncio.Event()
 
     def signal_handler():
@@ -125,6 +165,11 @@ async def main():
     except Exception as e:
         print(f">>> Unexpected error: {e}")
     finally:
+        if server is not None:
+            server.close()
+        clock_task.cancel()
+        if proc_task is not None:
+            proc_task.cancel()
         print(f">>> Final results: {len(monitor.latencies)} measurements collected")
         
         # Convert latencies dict to a list of objects for JSON serialization
@@ -132,22 +177,58 @@ async def main():
         for timestamp, latency in monitor.latencies.items():
             data.append({
                 "timestamp": timestamp,
-                "latency": latency
+                "latency": latency,
+                **monitor.self_samples.get(timestamp, {}),
             })
         
         # Sort by timestamp
         data.sort(key=lambda x: x["timestamp"])
         
         # Write results to timestamped JSON file
-        print(f">>> Saving {len(data)} records to {OUTPUT_FILE}")
-        with open(OUTPUT_FILE, "w") as f:
+        print(f">>> Saving {len(data)} records to {output_file}")
+        with open(output_file, "w") as f:
             json.dump(data, f, indent=2)
+        clock.save(output_file)
         print(">>> Done.")
 
 
-if __name__ == "__main__":
+def cli(argv=None, prog=None, defaults=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Probe busctl latency once a second")
+    parser.add_argument("output_file")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="serve live OpenMetrics on this port while probing",
+    )
+    parser.add_argument(
+        "--reference-clock",
+        metavar="HOST[:PORT]",
+        help="record offsets against a 'dbusbench clock serve' reference server so "
+        "results from several hosts can be merged with 'dbusbench fleet'",
+    )
+    parser.add_argument(
+        "--proc", action="append", default=[], metavar="LABEL=COMM[,COMM...]",
+        help="processes to sample instead of the bus daemon, PID 1 and runtime shims",
+    )
+    parser.add_argument("--no-proc", action="store_true", help="don't sample other processes")
+    config.apply_defaults(parser, defaults)
+    args = parser.parse_args(argv)
+    try:
+        proc_targets = {} if args.no_proc else procstat.parse_targets(args.proc) or None
+    except ValueError as e:
+        parser.error(str(e))
     try:
-        asyncio.run(main())
+        asyncio.run(main(
+            args.output_file,
+            args.metrics_port,
+            args.reference_clock,
+            proc_targets,
+        ))
     except KeyboardInterrupt:
         # This should not happen now since we handle SIGINT in the event loop
-        print("\n>>> Fallback Ctrl+C handler. Graceful shutdown may not have completed.")
\ No newline at end of file
+        print("\n>>> Fallback Ctrl+C handler. Graceful shutdown may not have completed.")
+
+
+if __name__ == "__main__":
+    cli()
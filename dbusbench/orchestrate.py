@@ -0,0 +1,156 @@
+"""
+Container-scaling experiment driver (the Python form of isolated/script.sh
+and collect_data.sh).
+
+For every container count, once with and once without systemd cgroups:
+start a latency probe, start the containers, wait until they are all
+running, let them run, kill and delete them, then stop the probe. Each run
+writes systemd_<on|off>_<N>.json (probe results) plus an .events.json
+orchestrator log that ``dbusbench lifecycle --events`` understands.
+
+Needs root for the container runtime, e.g.:
+    sudo dbusbench orchestrate --runtime runsc --bundle /path/to/bundle
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import zipfile
+from datetime import datetime
+
+from dbusbench import config
+
+COUNTS = [100, 300, 500, 700, 1000]
+SETTLE_SEC = 10
+HOLD_SEC = 20
+START_TIMEOUT_SEC = 600
+SYSTEMD_FLAG = {"runsc": "-systemd-cgroup", "runc": "--systemd-cgroup"}
+
+
+def containers(runtime, state):
+    out = subprocess.run([runtime, "list"], capture_output=True, text=True).stdout
+    ids = []
+    for line in out.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) >= 3 and fields[2] == state:
+            ids.append(fields[0])
+    return ids
+
+
+def start_probe(output_file, reference_clock=None):
+    cmd = [sys.executable, "-m", "dbusbench", "probe", output_file]
+    if reference_clock:
+        cmd += ["--reference-clock", reference_clock]
+    return subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+
+
+def teardown(runtime, events):
+    running = containers(runtime, "running")
+    for cid in running:
+        subprocess.run([runtime, "kill", cid, "KILL"], stderr=subprocess.DEVNULL)
+        events.append({"timestamp": time.time(), "event": "stop", "container": cid})
+    print(f"killed {len(running)} running containers")
+    time.sleep(1)
+    stopped = containers(runtime, "stopped")
+    for cid in stopped:
+        subprocess.run([runtime, "delete", cid], stderr=subprocess.DEVNULL)
+    print(f"deleted {len(stopped)} stopped containers")
+
+
+def run_experiment(runtime, bundle, n, systemd, out_dir=".", settle=SETTLE_SEC,
+                   hold=HOLD_SEC, reference_clock=None):
+    """One probe run around starting and stopping ``n`` containers."""
+    logfile = os.path.join(out_dir, f"systemd_{'on' if systemd else 'off'}_{n}.json")
+    events = []
+    probe = start_probe(logfile, reference_clock)
+    print(f"started monitoring on {logfile}")
+    try:
+        time.sleep(settle)
+
+        print("starting containers")
+        flags = [SYSTEMD_FLAG[runtime]] if systemd else []
+        procs = []
+        for i in range(1, n + 1):
+            name = f"container_{i}"
+            events.append({"timestamp": time.time(), "event": "start", "container": name})
+            procs.append(subprocess.Popen(
+                [runtime, *flags, "run", "-bundle", bundle, "-detach", name],
+                stdout=subprocess.DEVNULL,
+            ))
+        for proc in procs:
+            proc.wait()
+
+        deadline = time.time() + START_TIMEOUT_SEC
+        while len(containers(runtime, "running")) < n:
+            if time.time() > deadline:
+                print(f"gave up waiting for {n} containers")
+                break
+            print("Waiting for all containers to start...")
+            time.sleep(1)
+        print(f"spun up all {n} containers")
+
+        time.sleep(hold)
+        print("spinning down containers")
+        teardown(runtime, events)
+    finally:
+        probe.send_signal(signal.SIGINT)
+        probe.wait()
+        with open(logfile + ".events.json", "w") as f:
+            json.dump(events, f)
+    print(f"wrote results to {logfile}")
+    return logfile
+
+
+def cli(argv=None, prog=None, defaults=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Run the container-scaling experiment")
+    parser.add_argument("--runtime", choices=sorted(SYSTEMD_FLAG), default="runsc")
+    parser.add_argument("--bundle", required=True, help="OCI bundle to run")
+    parser.add_argument(
+        "--counts",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=COUNTS,
+        help="comma-separated container counts",
+    )
+    parser.add_argument(
+        "--systemd",
+        type=lambda s: s.split(","),
+        default=["on", "off"],
+        help="systemd-cgroup settings to run, in order (on,off)",
+    )
+    parser.add_argument("--settle", type=float, default=SETTLE_SEC,
+                        help="seconds of probing before starting containers")
+    parser.add_argument("--hold", type=float, default=HOLD_SEC,
+                        help="seconds to let the containers run")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--reference-clock", help="clocksync reference server for the probe")
+    parser.add_argument("--no-zip", action="store_true", help="don't archive the results")
+    config.apply_defaults(parser, defaults)
+    args = parser.parse_args(argv)
+    if any(s not in ("on", "off") for s in args.systemd):
+        parser.error("--systemd must be on, off or on,off")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    written = []
+    for setting in args.systemd:
+        for n in args.counts:
+            logfile = run_experiment(
+                args.runtime, args.bundle, n, setting == "on", args.out_dir,
+                args.settle, args.hold, args.reference_clock,
+            )
+            written += [logfile, logfile + ".clock.json", logfile + ".events.json"]
+
+    if not args.no_zip:
+        archive = os.path.join(args.out_dir, "data_{:%Y%m%d%H%M%S}.zip".format(datetime.now()))
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
+            for path in written:
+                if os.path.exists(path):
+                    z.write(path, os.path.basename(path))
+        print(f"archived results to {archive}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,85 @@
+"""
+Plot result files of any kind; the tool that wrote each file is recognised
+from its contents. Probe files are compared on one ECDF figure, load files
+on one latency-vs-throughput figure.
+
+Usage: dbusbench plot <RESULT FILE> [...] [--out-dir DIR]
+"""
+
+import argparse
+import json
+import os
+
+from dbusbench import config
+
+
+def plot_files(paths, out_dir=None):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    from dbusbench import raster
+    from dbusbench.report import classify
+
+    written = []
+    probes = []
+    loads = []
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        kind = classify(data)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        base = os.path.join(out_dir or os.path.dirname(path) or ".", stem)
+        if kind == "asyncbench":
+            from dbusbench import asyncplot
+
+            asyncplot.plot(data, base + ".latency.png")
+            written.append(base + ".latency.png")
+        elif kind == "measure":
+            from dbusbench import measure
+
+            measure.plot_columns(raster.columns(data, measure.COLUMNS), base + ".dual.png")
+            written.append(base + ".dual.png")
+        elif kind == "probe":
+            probes.append((stem, path))
+        elif kind == "load":
+            loads.append((stem, data))
+        elif kind == "bus":
+            print(f"Skipping {path}: bus logs are explored with 'dbusbench serve'")
+        else:
+            print(f"Skipping {path}: not a result file")
+
+    out_dir = out_dir or "."
+    if probes:
+        from dbusbench import ecdf, subplots
+
+        groups_ms = [(label, ecdf.load_group([path])) for label, path in probes]
+        for name, plotter in (("ecdf.png", ecdf.plot_ecdf), ("ecdf_subplots.png", subplots.plot_subplots)):
+            outfile = os.path.join(out_dir, name)
+            plt.close(plotter(groups_ms, outfile))
+            written.append(outfile)
+    if loads:
+        from dbusbench import loadplot
+
+        outfile = os.path.join(out_dir, "load.png")
+        loadplot.plot_columns([(label, loadplot.columns(data)) for label, data in loads], outfile)
+        written.append(outfile)
+    return written
+
+
+def cli(argv=None, prog=None, defaults=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Plot result files")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--out-dir", default=None,
+                        help="where to write figures (default: next to each file)")
+    config.apply_defaults(parser, defaults)
+    args = parser.parse_args(argv)
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    for outfile in plot_files(args.files, args.out_dir):
+        print(f"Wrote {outfile}")
+
+
+if __name__ == "__main__":
+    cli()
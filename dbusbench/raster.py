@@ -0,0 +1,131 @@
+"""
+Per-pixel aggregation for plotting long time series.
+
+Instead of handing matplotlib every sample, bin the series into one bucket
+per output pixel column and draw the min/max envelope plus the mean. All the
+work happens on epoch-float NumPy arrays; no datetime objects are created.
+"""
+
+import time
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400.0
+SECONDS_PER_HOUR = 3600.0
+
+
+def columns(records, keys):
+    """Pull ``keys`` out of a list of dicts as float64 arrays (missing/None -> NaN)."""
+    n = len(records)
+    return {
+        key: np.fromiter(
+            (np.nan if (v := r.get(key)) is None else v for r in records), dtype=np.float64, count=n
+        )
+        for key in keys
+    }
+
+
+def _gmtoff(t):
+    return time.localtime(t).tm_gmtoff
+
+
+def utc_offsets(t):
+    """
+    Local UTC offset in seconds at each epoch time in ``t``. The offset is
+    looked up once an hour across the span and each change (DST) is bisected
+    to the second, so long arrays cost a handful of localtime() calls.
+    """
+    lo, hi = float(np.nanmin(t)), float(np.nanmax(t))
+    grid = np.append(np.arange(lo, hi, SECONDS_PER_HOUR), hi)
+    offsets = [_gmtoff(x) for x in grid]
+    changes = [lo]
+    values = [offsets[0]]
+    for a, b, off_a, off_b in zip(grid, grid[1:], offsets, offsets[1:]):
+        if off_a == off_b:
+            continue
+        while b - a > 1.0:
+            mid = (a + b) / 2
+            if _gmtoff(mid) == off_a:
+                a = mid
+            else:
+                b = mid
+        changes.append(b)
+        values.append(off_b)
+    idx = np.searchsorted(changes, t, side="right") - 1
+    return np.asarray(values, dtype=np.float64)[np.clip(idx, 0, None)]
+
+
+def to_num(t):
+    """Epoch seconds -> matplotlib date numbers in local time (like fromtimestamp)."""
+    t = np.asarray(t, dtype=np.float64)
+    if t.size == 0:
+        return t
+    return (t + utc_offsets(t)) / SECONDS_PER_DAY
+
+
+def envelope(t, y, nbins):
+    """
+    Aggregate (t, y) into ``nbins`` equal-width time bins.
+
+    Returns (centers, ymin, ymax, ymean) with empty bins dropped. ``t`` is
+    expected to be sorted, as every time series we write is; unsorted input
+    is sorted first.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if t.size and np.any(t[1:] < t[:-1]):
+        order = np.argsort(t, kind="stable")
+        t, y = t[order], y[order]
+
+    lo, hi = t[0], t[-1]
+    if hi <= lo:
+        hi = lo + 1.0
+    edges = np.linspace(lo, hi, nbins + 1)
+    starts = np.searchsorted(t, edges[:-1], side="left")
+    counts = np.diff(np.append(starts, t.size))
+    nonempty = counts > 0
+    starts = starts[nonempty]
+    counts = counts[nonempty]
+
+    # NaN (unknown) samples are left out; a bin of only NaNs stays NaN
+    ymin = np.fmin.reduceat(y, starts)
+    ymax = np.fmax.reduceat(y, starts)
+    known = ~np.isnan(y)
+    with np.errstate(invalid="ignore"):
+        ymean = np.add.reduceat(np.where(known, y, 0.0), starts) / np.add.reduceat(known, starts)
+    centers = ((edges[:-1] + edges[1:]) / 2)[nonempty]
+    return centers, ymin, ymax, ymean
+
+
+def plot_envelope(ax, t, y, nbins, color, label=None):
+    """Draw ``y`` against epoch seconds ``t`` on ``ax`` at ``nbins`` resolution."""
+    t = np.asarray(t, dtype=np.float64)
+    if t.size == 0:
+        return
+    if t.size <= 2 * nbins:
+        # Already at or below screen resolution; draw it as-is
+        ax.plot(to_num(t), y, color=color, label=label)
+        return
+    centers, ymin, ymax, ymean = envelope(t, y, nbins)
+    x = to_num(centers)
+    ax.fill_between(x, ymin, ymax, color=color, alpha=0.3, linewidth=0)
+    ax.plot(x, ymean, color=color, label=label)
+
+
+def runs(t, mask):
+    """(start, end) timestamps of each run of True in ``mask``, widened to the
+    neighbouring samples so single-sample runs still have a visible width."""
+    t = np.asarray(t, dtype=np.float64)
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return []
+    edges = np.diff(mask.astype(np.int8), prepend=0, append=0)
+    first = np.flatnonzero(edges == 1)
+    last = np.flatnonzero(edges == -1) - 1
+    start = t[np.maximum(first - 1, 0)]
+    end = t[np.minimum(last + 1, t.size - 1)]
+    return list(zip(start.tolist(), end.tolist()))
+
+
+def pixel_width(fig, dpi):
+    return max(int(fig.get_figwidth() * dpi), 1)
@@ -0,0 +1,300 @@
+"""
+Batch report generator for every run under a directory.
+
+Discovers result files, parses each one once into a NumPy column cache keyed
+by content hash and parser version, and renders only the figures and tables
+whose inputs (or renderer/parser version) changed since the last run.
+Parsing and rendering both run in a process pool whose workers use the
+non-interactive Agg backend; bus logs are classified from their first
+record without being loaded.
+
+Usage: dbusbench report <RESULTS DIR> [--out DIR] [--jobs N] [--force]
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from dbusbench import config
+from dbusbench import raster
+
+# Bump to invalidate every cached figure after changing a renderer
+RENDER_VERSION = 4
+# Bump when parse() writes different columns; cached .npz files are keyed by
+# input hash and this version, so old ones are simply not found and reparsed
+PARSE_VERSION = 4
+
+PROBE_COLUMNS = ["timestamp", "latency"]
+# Kinds we keep parsed columns for; the rest are only classified
+PARSED_KINDS = {"asyncbench", "measure", "probe", "load"}
+PERCENTILES = [50, 90, 95, 99]
+# Enough of a file to decode the first record of any result list
+PEEK_BYTES = 1 << 16
+
+
+def classify(data):
+    """Recognise which tool wrote a parsed JSON result file."""
+    if isinstance(data, dict):
+        return "load" if "phases" in data else None
+    if not data or not isinstance(data[0], dict):
+        return None
+    keys = data[0].keys()
+    if "member" in keys:
+        return "bus"
+    if "avg_msgs_per_sec" in keys:
+        return "asyncbench" if "busctl_latency" in keys else "measure"
+    if "latency" in keys:
+        return "probe"
+    return None
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def first_record(path):
+    """First element of a JSON list file, decoded from a bounded prefix (or None)."""
+    with open(path, "rb") as f:
+        head = f.read(PEEK_BYTES).decode(errors="ignore").lstrip()
+    if not head.startswith("["):
+        return None
+    try:
+        record, _ = json.JSONDecoder().raw_decode(head[1:].lstrip())
+    except ValueError:
+        return None
+    return record
+
+
+def init_worker():
+    # Before anything in the worker imports pyplot
+    os.environ["MPLBACKEND"] = "Agg"
+
+
+def parse(path, npz_path):
+    """Parse one result file into ``npz_path``; return its kind."""
+    # Bus logs can be gigabytes and are only classified, never parsed
+    record = first_record(path)
+    if isinstance(record, dict) and (kind := classify([record])) not in PARSED_KINDS:
+        return kind
+    with open(path) as f:
+        data = json.load(f)
+    kind = classify(data)
+    if kind == "asyncbench":
+        from dbusbench import asyncplot
+
+        np.savez(npz_path, **raster.columns(data, asyncplot.COLUMNS))
+    elif kind == "measure":
+        from dbusbench import measure
+
+        np.savez(npz_path, **raster.columns(data, measure.COLUMNS))
+    elif kind == "probe":
+        np.savez(npz_path, **raster.columns(data, PROBE_COLUMNS))
+    elif kind == "load":
+        from dbusbench import loadplot
+
+        np.savez(npz_path, **loadplot.columns(data))
+    return kind
+
+
+def render(kind, output, inputs):
+    """Render one target from ``inputs``: a list of (label, npz path)."""
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    cols = [(label, dict(np.load(npz))) for label, npz in inputs]
+    if kind == "asyncbench":
+        from dbusbench import asyncplot
+
+        asyncplot.plot_columns(cols[0][1], output)
+    elif kind == "measure":
+        from dbusbench import measure
+
+        measure.plot_columns(cols[0][1], output)
+    elif kind == "load":
+        from dbusbench import loadplot
+
+        loadplot.plot_columns(cols, output)
+    elif kind in ("ecdf", "ecdf_subplots"):
+        import matplotlib.pyplot as plt
+
+        groups_ms = [(label, c["latency"] * 1000) for label, c in cols]
+        if kind == "ecdf":
+            from dbusbench import ecdf
+
+            fig = ecdf.plot_ecdf(groups_ms, output)
+        else:
+            from dbusbench import subplots
+
+            fig = subplots.plot_subplots(groups_ms, output)
+        plt.close(fig)
+    elif kind == "percentiles":
+        with open(output, "w") as f:
+            f.write("run,samples," + ",".join(f"p{p}_ms" for p in PERCENTILES) + "\n")
+            for label, c in cols:
+                lat = c["latency"] * 1000
+                values = np.percentile(lat, PERCENTILES) if lat.size else [np.nan] * len(PERCENTILES)
+                f.write(f"{label},{lat.size}," + ",".join(f"{v:.3f}" for v in values) + "\n")
+    return output
+
+
+class Cache:
+    """Content-hash cache of parsed inputs and of what each target was built from."""
+
+    def __init__(self, out_dir):
+        self.dir = os.path.join(out_dir, ".cache")
+        os.makedirs(self.dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.dir, "manifest.json")
+        try:
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        self.manifest.setdefault("stat", {})
+        self.manifest.setdefault("kinds", {})
+        self.manifest.setdefault("targets", {})
+
+    def save(self):
+        with open(self.manifest_path, "w") as f:
+            json.dump(self.manifest, f, indent=1)
+
+    def npz(self, sha):
+        return os.path.join(self.dir, f"{sha}.v{PARSE_VERSION}.npz")
+
+    def prune(self):
+        """Delete column caches written by other parser versions."""
+        current = f".v{PARSE_VERSION}.npz"
+        for name in os.listdir(self.dir):
+            if name.endswith(".npz") and not name.endswith(current):
+                os.remove(os.path.join(self.dir, name))
+
+    def hash(self, path):
+        """Content hash, skipping the read when size and mtime are unchanged."""
+        st = os.stat(path)
+        stamp = [st.st_mtime_ns, st.st_size]
+        cached = self.manifest["stat"].get(path)
+        if cached and cached[:2] == stamp:
+            return cached[2]
+        sha = file_hash(path)
+        self.manifest["stat"][path] = stamp + [sha]
+        return sha
+
+    def is_fresh(self, output, key):
+        return self.manifest["targets"].get(output) == key and os.path.exists(output)
+
+
+def discover(root, out_dir):
+    out_dir = os.path.abspath(out_dir)
+    for dirpath, dirnames, filenames in os.walk(root):
+        if os.path.commonpath([os.path.abspath(dirpath), out_dir]) == out_dir:
+            dirnames[:] = []
+            continue
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.endswith(".json"):
+                yield os.path.join(dirpath, name)
+
+
+def build_targets(root, out_dir, files):
+    """
+    Dependency graph from parsed inputs to figures and tables.
+
+    ``files`` is a list of (path, sha, kind). Returns (kind, output, inputs)
+    with inputs as (label, path, sha) triples.
+    """
+    targets = []
+    probes_by_dir = {}
+    for path, sha, kind in files:
+        rel = os.path.splitext(os.path.relpath(path, root))[0]
+        label = os.path.basename(rel)
+        if kind == "asyncbench":
+            targets.append((kind, os.path.join(out_dir, rel + ".latency.png"), [(label, path, sha)]))
+        elif kind == "measure":
+            targets.append((kind, os.path.join(out_dir, rel + ".dual.png"), [(label, path, sha)]))
+        elif kind == "load":
+            targets.append((kind, os.path.join(out_dir, rel + ".load.png"), [(label, path, sha)]))
+        elif kind == "probe":
+            probes_by_dir.setdefault(os.path.dirname(rel), []).append((label, path, sha))
+
+    for rel_dir, inputs in sorted(probes_by_dir.items()):
+        base = os.path.join(out_dir, rel_dir)
+        targets.append(("ecdf", os.path.join(base, "ecdf.png"), inputs))
+        targets.append(("ecdf_subplots", os.path.join(base, "ecdf_subplots.png"), inputs))
+        targets.append(("percentiles", os.path.join(base, "percentiles.csv"), inputs))
+    return targets
+
+
+def target_key(kind, inputs):
+    h = hashlib.sha256(f"{RENDER_VERSION}:{PARSE_VERSION}:{kind}".encode())
+    for label, _path, sha in inputs:
+        h.update(f":{label}={sha}".encode())
+    return h.hexdigest()
+
+
+def main(root, out_dir, jobs=None, force=False):
+    cache = Cache(out_dir)
+    cache.prune()
+    paths = list(discover(root, out_dir))
+    shas = {path: cache.hash(path) for path in paths}
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=init_worker) as pool:
+        # Stage 1: parse inputs we haven't seen before
+        unparsed = {}
+        for path, sha in shas.items():
+            if sha not in cache.manifest["kinds"] or (
+                cache.manifest["kinds"][sha] in PARSED_KINDS
+                and not os.path.exists(cache.npz(sha))
+            ):
+                unparsed.setdefault(sha, path)
+        futures = {pool.submit(parse, path, cache.npz(sha)): sha for sha, path in unparsed.items()}
+        for fut in concurrent.futures.as_completed(futures):
+            sha = futures[fut]
+            try:
+                cache.manifest["kinds"][sha] = fut.result()
+            except (ValueError, OSError) as e:
+                print(f"Skipping {unparsed[sha]}: {e}")
+                cache.manifest["kinds"][sha] = None
+        print(f"Parsed {len(unparsed)} of {len(paths)} result files")
+
+        files = [(p, sha, cache.manifest["kinds"][sha]) for p, sha in shas.items()]
+        targets = build_targets(root, out_dir, files)
+
+        # Stage 2: render only stale targets
+        futures = {}
+        for kind, output, inputs in targets:
+            key = target_key(kind, inputs)
+            if not force and cache.is_fresh(output, key):
+                continue
+            npz_inputs = [(label, cache.npz(sha)) for label, _path, sha in inputs]
+            futures[pool.submit(render, kind, output, npz_inputs)] = (output, key)
+        for fut in concurrent.futures.as_completed(futures):
+            output, key = futures[fut]
+            try:
+                fut.result()
+                cache.manifest["targets"][output] = key
+                print(f"Wrote {output}")
+            except Exception as e:
+                print(f"Failed {output}: {e}")
+        print(f"Rendered {len(futures)} of {len(targets)} targets")
+
+    cache.save()
+
+
+def cli(argv=None, prog=None, defaults=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Render figures/tables for all runs")
+    parser.add_argument("root", help="directory tree containing result JSON files")
+    parser.add_argument("--out", default="report", help="output directory")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes")
+    parser.add_argument("--force", action="store_true", help="ignore the cache")
+    config.apply_defaults(parser, defaults)
+    args = parser.parse_args(argv)
+    main(args.root, args.out, args.jobs, args.force)
+
+
+if __name__ == "__main__":
+    cli()
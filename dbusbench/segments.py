@@ -0,0 +1,252 @@
+"""
+Time-indexed segmented bus captures.
+
+A capture is a directory of time-bounded segments plus ``index.json``, which
+maps each segment's time range to its file, column offsets and per-member
+summary counts. Segment files are raw columns (the layout of
+busstore.MessageStore), so readers memory-map only the segments that overlap
+the requested range and binary-search the timestamp column inside them.
+
+Usage:
+    dbusbench segments convert <BUS FILE> <CAPTURE DIR> [--segment-seconds N]
+    dbusbench segments info <CAPTURE DIR>
+    dbusbench segments query <CAPTURE DIR> <START> <END> [--messages]
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+from collections import Counter
+
+from dbusbench import busstore
+from dbusbench import config
+
+INDEX_FILE = "index.json"
+SEGMENT_SECONDS = 60
+
+
+class SegmentWriter:
+    """Drop-in replacement for a MessageStore that spills to disk per segment."""
+
+    def __init__(self, directory, segment_seconds=SEGMENT_SECONDS):
+        self.directory = directory
+        self.segment_seconds = segment_seconds
+        os.makedirs(directory, exist_ok=True)
+        self.index = {
+            "version": 1,
+            "fields": list(busstore.FIELDS),
+            "segment_seconds": segment_seconds,
+            "segments": [],
+        }
+        self.store = busstore.MessageStore()
+        self.segment_start = None
+        self.total = 0
+        self.sorted = True
+        self.segments_started = 0
+        # Segments are written by one background thread, in order, so the
+        # collector's event loop never blocks on file I/O
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.pending = []
+        self._write_index()
+
+    def __len__(self):
+        return self.total
+
+    def _roll(self, ts):
+        if self.segment_start is None:
+            self.segment_start = ts
+        elif ts >= self.segment_start + self.segment_seconds:
+            self.flush()
+            self.segment_start = ts
+        elif ts < self.store.timestamps[-1]:
+            self.sorted = False
+        self.total += 1
+
+    def append(self, msg):
+        self._roll(msg["timestamp"])
+        self.store.append(msg)
+
+    def append_raw(self, msg, payload):
+        self._roll(msg["timestamp"])
+        self.store.append_raw(msg, payload)
+
+    def flush(self):
+        """Hand the current segment to the writer thread and start a new one."""
+        store = self.store
+        if not len(store):
+            return
+        name = f"seg_{self.segments_started:06d}"
+        self.segments_started += 1
+        self.pending = [f for f in self.pending if not f.done() or f.exception()]
+        self.pending.append(self.executor.submit(self._write_segment, name, store, self.sorted))
+        self.store = busstore.MessageStore()
+        self.sorted = True
+
+    def _write_segment(self, name, store, is_sorted):
+        """Write one segment and publish it in the index."""
+        columns = {}
+        offset = 0
+        with open(os.path.join(self.directory, name + ".bin"), "wb") as f:
+            blocks = [("timestamp", "<f8", store.timestamps)]
+            blocks += [(field, "<u4", store.columns[field]) for field in busstore.FIELDS]
+            blocks += [("payload_offsets", "<u8", store.payload_offsets)]
+            # array.array writes native order; every host we run on is little-endian
+            for key, dtype, arr in blocks:
+                f.write(arr)
+                columns[key] = [offset, dtype, len(arr)]
+                offset += arr.itemsize * len(arr)
+            f.write(store.payloads)
+            columns["payloads"] = [offset, "u1", len(store.payloads)]
+
+        with open(os.path.join(self.directory, name + ".strings.json"), "w") as f:
+            json.dump({field: store.tables[field].strings for field in busstore.FIELDS}, f)
+
+        members = store.tables["member"].strings
+        self.index["segments"].append({
+            "name": name,
+            "start": min(store.timestamps),
+            "end": max(store.timestamps),
+            "count": len(store),
+            "sorted": is_sorted,
+            "payload_bytes": len(store.payloads),
+            "columns": columns,
+            # Id 0 is a message without a member; it has no name to count under
+            "members": {
+                members[i]: n for i, n in Counter(store.columns["member"]).most_common() if i
+            },
+        })
+        self._write_index()
+
+    def close(self):
+        """Flush the last segment and wait until every segment is on disk."""
+        self.flush()
+        self.executor.shutdown(wait=True)
+        for future in self.pending:
+            future.result()
+
+    def _write_index(self):
+        # Replace atomically so a reader (or a crash) never sees a torn index
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.index, f)
+        os.replace(path + ".tmp", path)
+
+
+class SegmentReader:
+    """Range queries over a capture directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        self.segments = self.index["segments"]
+
+    @property
+    def start(self):
+        return self.segments[0]["start"] if self.segments else None
+
+    @property
+    def end(self):
+        return max(s["end"] for s in self.segments) if self.segments else None
+
+    def overlapping(self, start, end):
+        return [s for s in self.segments if s["end"] >= start and s["start"] <= end]
+
+    def member_counts(self, start, end):
+        """Approximate per-member counts from the index summaries alone."""
+        counts = Counter()
+        for seg in self.overlapping(start, end):
+            counts.update(seg["members"])
+        return counts
+
+    def _columns(self, seg):
+        import numpy as np
+
+        mm = np.memmap(os.path.join(self.directory, seg["name"] + ".bin"), mode="r")
+        cols = {}
+        for key, (offset, dtype, n) in seg["columns"].items():
+            itemsize = np.dtype(dtype).itemsize
+            cols[key] = mm[offset:offset + n * itemsize].view(dtype)
+        return cols
+
+    def load(self, start, end):
+        """MessageStore holding only the messages with start <= t <= end."""
+        import numpy as np
+
+        store = busstore.MessageStore()
+        for seg in self.overlapping(start, end):
+            cols = self._columns(seg)
+            ts = cols["timestamp"]
+            with open(os.path.join(self.directory, seg["name"] + ".strings.json")) as f:
+                strings = json.load(f)
+            po = cols["payload_offsets"]
+            arena = cols["payloads"]
+            if seg["sorted"]:
+                lo = np.searchsorted(ts, start, side="left")
+                hi = np.searchsorted(ts, end, side="right")
+                rows = slice(lo, hi)
+                offsets = po[lo:hi + 1]
+            else:
+                # Out-of-order segment: gather the matching payloads into a new arena
+                rows = np.flatnonzero((ts >= start) & (ts <= end))
+                arena = b"".join(bytes(arena[po[i]:po[i + 1]]) for i in rows)
+                offsets = np.concatenate(([0], np.cumsum(po[rows + 1] - po[rows])))
+            store.extend_encoded(
+                ts[rows], {f: cols[f][rows] for f in busstore.FIELDS}, strings, offsets, arena
+            )
+        return store
+
+
+def convert(bus_file, directory, segment_seconds=SEGMENT_SECONDS):
+    with open(bus_file) as f:
+        msgs = json.load(f)
+    writer = SegmentWriter(directory, segment_seconds)
+    for msg in sorted(msgs, key=lambda m: m["timestamp"]):
+        writer.append(msg)
+    writer.close()
+    return writer
+
+
+def cli(argv=None, prog=None, defaults=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Segmented bus capture tool")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("convert", help="split a legacy JSON bus log into segments")
+    p.add_argument("bus_file")
+    p.add_argument("directory")
+    p.add_argument("--segment-seconds", type=float, default=SEGMENT_SECONDS)
+    p = sub.add_parser("info", help="summarize a capture")
+    p.add_argument("directory")
+    p = sub.add_parser("query", help="messages/members in an epoch-seconds range")
+    p.add_argument("directory")
+    p.add_argument("start", type=float)
+    p.add_argument("end", type=float)
+    p.add_argument("--messages", action="store_true", help="print the messages as JSON")
+    config.apply_defaults(parser, defaults)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "convert":
+        writer = convert(args.bus_file, args.directory, args.segment_seconds)
+        print(f"Wrote {len(writer)} messages in {len(writer.index['segments'])} segments")
+    elif args.cmd == "info":
+        reader = SegmentReader(args.directory)
+        total = sum(s["count"] for s in reader.segments)
+        print(f"{len(reader.segments)} segments, {total} messages, {reader.start} - {reader.end}")
+        for name, n in reader.member_counts(reader.start, reader.end).most_common(20):
+            print(f"{n:10d}  {name}")
+    elif args.cmd == "query":
+        reader = SegmentReader(args.directory)
+        store = reader.load(args.start, args.end)
+        if args.messages:
+            import sys
+
+            store.dump_json(sys.stdout)
+        else:
+            counts = Counter(store.tables["member"].strings[i] for i in store.columns["member"])
+            print(f"{len(store)} messages")
+            for name, n in counts.most_common(20):
+                print(f"{n:10d}  {name}")
+
+
+if __name__ == "__main__":
+    cli()
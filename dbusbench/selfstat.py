@@ -0,0 +1,86 @@
+"""
+Self-overhead sampling for the benchmark tools.
+
+Every collector samples its own CPU time, RSS, scheduling lag and number of
+child processes at each tick so that plots can tell a real latency spike
+apart from one caused by the tool itself falling behind.
+"""
+
+import asyncio
+import os
+import time
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# Thresholds above which a tick is considered tainted by our own overhead
+LAG_SATURATED = 0.05  # seconds late for a timer
+CPU_SATURATED = 90.0  # percent of one core
+
+COLUMNS = ("self_cpu_time", "self_cpu_pct", "self_rss_bytes", "loop_lag", "num_children")
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE
+
+
+def num_children():
+    """Count direct children of this process across all of its threads."""
+    n = 0
+    try:
+        for tid in os.listdir("/proc/self/task"):
+            with open(f"/proc/self/task/{tid}/children") as f:
+                n += len(f.read().split())
+    except OSError:
+        # Kernel without CONFIG_PROC_CHILDREN
+        return -1
+    return n
+
+
+class LoopLag:
+    """Track how late a periodic asyncio timer wakes up."""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.max_lag = 0.0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(loop.time() - expected)
+
+    def record(self, lag):
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+    def take(self):
+        """Return the worst lag since the previous call and reset it."""
+        lag, self.max_lag = self.max_lag, 0.0
+        return lag
+
+
+class SelfSampler:
+    """Produce the self-overhead columns for one sample tick."""
+
+    def __init__(self, lag=None):
+        self.lag = lag if lag is not None else LoopLag()
+        self.last_cpu = time.process_time()
+        self.last_wall = time.monotonic()
+
+    def sample(self):
+        cpu = time.process_time()
+        wall = time.monotonic()
+        elapsed = wall - self.last_wall
+        cpu_pct = 100.0 * (cpu - self.last_cpu) / elapsed if elapsed > 0 else 0.0
+        self.last_cpu = cpu
+        self.last_wall = wall
+        return {
+            "self_cpu_time": cpu,
+            "self_cpu_pct": cpu_pct,
+            "self_rss_bytes": rss_bytes(),
+            "loop_lag": self.lag.take(),
+            "num_children": num_children(),
+        }
+
@@ -0,0 +1,39 @@
+"""
+Interactive explorer for one run: a bokeh server running smartplot.py.
+
+Usage: dbusbench serve <RESULTS FILE> <BUS FILE | CAPTURE DIR> [--port N] [--show]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from dbusbench import config
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "smartplot.py")
+PORT = 5006
+
+
+def cli(argv=None, prog=None, defaults=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Explore a run in the browser")
+    parser.add_argument("results")
+    parser.add_argument("bus", help="bus log JSON file or segmented capture directory")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--show", action="store_true", help="open a browser tab")
+    config.apply_defaults(parser, defaults)
+    args = parser.parse_args(argv)
+
+    # Run bokeh from this interpreter so the app can import dbusbench
+    cmd = [sys.executable, "-m", "bokeh", "serve", APP, "--port", str(args.port)]
+    if args.show:
+        cmd.append("--show")
+    cmd += ["--args", args.results, args.bus]
+    try:
+        sys.exit(subprocess.call(cmd))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    cli()
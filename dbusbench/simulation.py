@@ -0,0 +1,495 @@
+"""
+D-Bus load generator.
+
+By default walks a fixed open-loop schedule of request rates. With
+--concurrency it instead runs closed-loop phases: N clients that each send
+the next call as soon as the previous one returns. With --slo-ms it instead
+searches for the highest rate that still meets a latency SLO: the rate is
+doubled until a phase fails, then bisected. Each phase discards a warm-up
+period and runs only until a confidence interval for the SLO quantile is
+clearly on one side of the limit.
+
+Usage:
+    dbusbench load [--schedule 100,200,400] [--duration 8]
+    dbusbench load --slo-ms 20 [--quantile 99] [--start-rate 50] [--max-rate 4000]
+    dbusbench load --concurrency 1,2,4,8,16,32 [--duration 8] [--warmup 2]
+"""
+
+import argparse
+import subprocess
+import time
+import concurrent.futures
+from datetime import datetime
+import json
+import math
+import os
+from statistics import NormalDist
+from threading import Lock
+
+from dbusbench import config
+from dbusbench import selfstat
+
+lock = Lock()
+
+SCHEDULE = [100, 200, 400, 800, 1600, 2000]
+DURATION_PER_LEVEL = 8
+
+# Search-mode phase control
+WARMUP_SEC = 2.0
+MIN_MEASURE_SEC = 3.0
+MAX_MEASURE_SEC = 15.0
+CONFIDENCE = 0.95
+# A rate whose completions fall this far behind the offered rate is saturated
+# whatever the latency says
+MIN_ACHIEVED_FRACTION = 0.9
+TOLERANCE = 0.05
+# How often closed-loop phases count the busctl calls actually running
+IN_FLIGHT_SAMPLE_SEC = 0.1
+
+
+def create_load(duration_list):
+    start = time.time()
+    cmd = "busctl get-property org.freedesktop.systemd1 /org/freedesktop/systemd1 org.freedesktop.systemd1.Manager Version"
+    subprocess.run(cmd.split(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    end = time.time()
+
+    duration_ms = (end - start) * 1000.0
+    with lock:
+        duration_list.append(duration_ms)
+
+
+def run_load_for_rate(rate_per_sec, duration_sec, warmup_sec=0.0, stop=None):
+    """
+    Offer ``rate_per_sec`` calls for up to ``duration_sec`` after a warm-up.
+    Calls started during warm-up are kept apart from ``call_durations_ms``.
+    ``stop(durations_ms, measured_sec)`` is asked once a second whether the
+    phase has seen enough.
+    """
+    print(f"Starting load: {rate_per_sec} msgs/sec for {duration_sec} seconds")
+    interval = 1.0 / rate_per_sec
+    t0 = time.time()
+    warmup_end = t0 + warmup_sec
+    end_time = warmup_end + duration_sec
+    phase_start = datetime.now()
+
+    # Stats
+    durations = []
+    warmup_durations = []
+    counts_per_second = []
+    self_samples = []
+
+    # Our own scheduling lag: how late each submit is relative to its slot
+    loop_lag = selfstat.LoopLag(interval)
+    self_sampler = selfstat.SelfSampler(loop_lag)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=rate_per_sec) as executor:
+        second_start = time.time()
+        count_this_second = 0
+        expected = second_start
+
+        while time.time() < end_time:
+            now = time.time()
+            loop_lag.record(now - expected)
+            if now - second_start >= 1.0:
+                counts_per_second.append(count_this_second)
+                self_samples.append({"timestamp": now, **self_sampler.sample()})
+                count_this_second = 0
+                second_start = now
+                if stop is not None and now > warmup_end:
+                    with lock:
+                        snapshot = list(durations)
+                    if stop(snapshot, now - warmup_end):
+                        break
+
+            executor.submit(create_load, durations if now >= warmup_end else warmup_durations)
+            count_this_second += 1
+
+            elapsed = time.time() - now
+            sleep_time = max(0, interval - elapsed)
+            expected = now + elapsed + sleep_time
+            time.sleep(sleep_time)
+
+        # Capture last second's count
+        counts_per_second.append(count_this_second)
+        measured_sec = max(0.0, time.time() - warmup_end)
+
+    phase_end = datetime.now()
+    print(f"Finished load: {rate_per_sec} msgs/sec")
+
+    return {
+        "rate_per_sec": rate_per_sec,
+        "duration_sec": duration_sec,
+        "warmup_sec": warmup_sec,
+        "measured_sec": measured_sec,
+        "start_time": phase_start.isoformat(),
+        "end_time": phase_end.isoformat(),
+        "calls_per_second": counts_per_second,
+        "call_durations_ms": durations,
+        "warmup_call_durations_ms": warmup_durations,
+        "self_samples": self_samples,
+    }
+
+
+def busctl_children():
+    """
+    Number of busctl processes this process has running right now, from
+    /proc/self/task/*/children; None where the kernel doesn't provide it.
+    """
+    if not os.path.exists(f"/proc/self/task/{os.getpid()}/children"):
+        return None
+    count = 0
+    for tid in os.listdir("/proc/self/task"):
+        try:
+            with open(f"/proc/self/task/{tid}/children") as f:
+                pids = f.read().split()
+        except OSError:
+            # Thread exited
+            continue
+        for pid in pids:
+            try:
+                with open(f"/proc/{pid}/comm") as f:
+                    count += f.read().strip() == "busctl"
+            except OSError:
+                pass
+    return count
+
+
+def closed_loop_client(end_time, warmup_end, durations, warmup_durations):
+    while time.time() < end_time:
+        create_load(durations if time.time() >= warmup_end else warmup_durations)
+
+
+def run_closed_loop(concurrency, duration_sec, warmup_sec=0.0):
+    """
+    ``concurrency`` clients calling back-to-back for ``duration_sec`` after a
+    warm-up. Returns a phase in the same schema as run_load_for_rate, with
+    ``calls_per_second`` counting completions instead of submissions, plus
+    ``in_flight_samples``: busctl processes seen running every
+    IN_FLIGHT_SAMPLE_SEC after the warm-up.
+    """
+    print(f"Starting closed loop: {concurrency} clients for {duration_sec} seconds")
+    t0 = time.time()
+    warmup_end = t0 + warmup_sec
+    end_time = warmup_end + duration_sec
+    phase_start = datetime.now()
+
+    durations = []
+    warmup_durations = []
+    counts_per_second = []
+    in_flight = []
+    self_samples = []
+    loop_lag = selfstat.LoopLag(1.0)
+    self_sampler = selfstat.SelfSampler(loop_lag)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(closed_loop_client, end_time, warmup_end, durations, warmup_durations)
+
+        done = 0
+        expected = time.time() + 1.0
+        next_sample = warmup_end
+        while time.time() < end_time:
+            time.sleep(max(0.0, min(expected, next_sample, end_time) - time.time()))
+            now = time.time()
+            if now >= next_sample:
+                n = busctl_children()
+                if n is not None:
+                    in_flight.append(n)
+                next_sample += IN_FLIGHT_SAMPLE_SEC
+            if now < expected:
+                continue
+            loop_lag.record(max(0.0, now - expected))
+            with lock:
+                total = len(durations) + len(warmup_durations)
+            counts_per_second.append(total - done)
+            done = total
+            self_samples.append({"timestamp": now, **self_sampler.sample()})
+            expected += 1.0
+        # Calls still in flight finish (and are recorded) before we return
+    measured_sec = max(0.0, end_time - warmup_end)
+
+    phase_end = datetime.now()
+    print(f"Finished closed loop: {concurrency} clients")
+
+    return {
+        "mode": "closed",
+        "concurrency": concurrency,
+        "rate_per_sec": None,
+        "duration_sec": duration_sec,
+        "warmup_sec": warmup_sec,
+        "measured_sec": measured_sec,
+        "start_time": phase_start.isoformat(),
+        "end_time": phase_end.isoformat(),
+        "calls_per_second": counts_per_second,
+        "in_flight_samples": in_flight,
+        "call_durations_ms": durations,
+        "warmup_call_durations_ms": warmup_durations,
+        "self_samples": self_samples,
+    }
+
+
+def phase_stats(phase, quantile=99):
+    """Achieved throughput and latency percentiles of one phase (any mode)."""
+    import numpy as np
+
+    lat = np.asarray(phase["call_durations_ms"], dtype=np.float64)
+    # Files from before warm-up handling only have the requested duration
+    seconds = phase.get("measured_sec") or phase["duration_sec"]
+    pct = np.percentile(lat, [50, 90, quantile]) if lat.size else [np.nan] * 3
+    stats = {
+        "offered_rate": phase.get("rate_per_sec"),
+        "achieved_rate": lat.size / seconds if seconds else 0.0,
+        "calls": int(lat.size),
+        "mean_ms": float(lat.mean()) if lat.size else float("nan"),
+        "p50_ms": float(pct[0]),
+        "p90_ms": float(pct[1]),
+        f"p{quantile:g}_ms": float(pct[2]),
+    }
+    if phase.get("concurrency"):
+        # Little's law (L = throughput * time per call) against the busctl
+        # processes actually seen running. A ratio above 1 means the timed
+        # calls include time with no call on the bus (fork/exec, our own
+        # scheduling); sampled in-flight below the client count means
+        # clients are starved.
+        in_flight = stats["achieved_rate"] * stats["mean_ms"] / 1000
+        samples = phase.get("in_flight_samples") or []
+        sampled = sum(samples) / len(samples) if samples else None
+        stats["concurrency"] = phase["concurrency"]
+        stats["littles_law_in_flight"] = in_flight
+        stats["sampled_in_flight"] = sampled
+        stats["littles_law_ratio"] = in_flight / sampled if sampled else None
+        stats["client_utilization"] = (
+            sampled / phase["concurrency"] if sampled is not None else None
+        )
+    return stats
+
+
+def quantile_ci(samples, quantile, confidence=CONFIDENCE):
+    """
+    Distribution-free confidence interval for a sample quantile: the order
+    statistics whose ranks bracket n*q by the binomial normal approximation.
+    """
+    import numpy as np
+
+    x = np.sort(np.asarray(samples, dtype=np.float64))
+    n = x.size
+    q = quantile / 100
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    half = z * math.sqrt(n * q * (1 - q))
+    lo = max(0, math.floor(n * q - half) - 1)
+    hi = min(n - 1, math.ceil(n * q + half))
+    return float(x[lo]), float(x[hi])
+
+
+def judge(durations_ms, measured_sec, rate, slo_ms, quantile):
+    """
+    "pass"/"fail" once the evidence is clear, else None, plus the quantile
+    estimate and its confidence interval.
+    """
+    import numpy as np
+
+    n = len(durations_ms)
+    if not n:
+        return None, None, None
+    estimate = float(np.percentile(durations_ms, quantile))
+    ci = quantile_ci(durations_ms, quantile)
+    if measured_sec >= MIN_MEASURE_SEC and n / measured_sec < MIN_ACHIEVED_FRACTION * rate:
+        return "fail", estimate, ci
+    # A tail quantile needs a handful of samples beyond it to mean anything
+    if n < 5 / (1 - quantile / 100):
+        return None, estimate, ci
+    if ci[0] > slo_ms:
+        return "fail", estimate, ci
+    if ci[1] <= slo_ms:
+        return "pass", estimate, ci
+    return None, estimate, ci
+
+
+def run_search_phase(rate, slo_ms, quantile, warmup_sec=WARMUP_SEC,
+                     max_measure_sec=MAX_MEASURE_SEC):
+    def stop(durations_ms, measured_sec):
+        if measured_sec < MIN_MEASURE_SEC:
+            return False
+        return judge(durations_ms, measured_sec, rate, slo_ms, quantile)[0] is not None
+
+    phase = run_load_for_rate(rate, max_measure_sec, warmup_sec, stop)
+    verdict, estimate, ci = judge(
+        phase["call_durations_ms"], phase["measured_sec"], rate, slo_ms, quantile
+    )
+    phase["decided"] = verdict is not None
+    if verdict is None:
+        # Ran out of time: fall back to the point estimate
+        verdict = "pass" if estimate is not None and estimate <= slo_ms else "fail"
+    phase["verdict"] = verdict
+    if verdict == "fail":
+        achieved = len(phase["call_durations_ms"]) / max(phase["measured_sec"], 1e-9)
+        phase["reason"] = "throughput" if achieved < MIN_ACHIEVED_FRACTION * rate else "latency"
+    phase["quantile_ms"] = estimate
+    phase["quantile_ci_ms"] = ci
+    print(f"  {rate} msgs/sec: p{quantile:g} {estimate} ms, CI {ci} -> {verdict}")
+    return phase
+
+
+def search(slo_ms, quantile=99, start_rate=50, max_rate=4000, tolerance=TOLERANCE,
+           warmup_sec=WARMUP_SEC, max_measure_sec=MAX_MEASURE_SEC):
+    """
+    Highest rate meeting p<quantile> <= slo_ms: double from ``start_rate``
+    (the last step capped at ``max_rate``) until a phase fails, then bisect
+    until the bracket is within ``tolerance``. Returns (knee_rate or None,
+    censored, phases); censored means nothing failed up to ``max_rate``, so
+    the knee is only a lower bound.
+    """
+    phases = []
+
+    def passes(rate):
+        phases.append(run_search_phase(rate, slo_ms, quantile, warmup_sec, max_measure_sec))
+        return phases[-1]["verdict"] == "pass"
+
+    lo, hi = None, None
+    rate = start_rate
+    while rate <= max_rate:
+        if not passes(rate):
+            hi = rate
+            break
+        lo = rate
+        if rate == max_rate:
+            break
+        rate = min(rate * 2, max_rate)
+    if lo is None:
+        # Fails at the starting rate
+        return None, False, phases
+    if hi is None:
+        return lo, True, phases
+
+    while hi - lo > max(1, tolerance * lo):
+        mid = (lo + hi) // 2
+        if passes(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo, False, phases
+
+
+def curve(phases, quantile=99):
+    """Latency-vs-throughput points, one per phase, by offered rate or clients."""
+    points = []
+    for phase in sorted(phases, key=lambda p: (p["rate_per_sec"] or 0, p.get("concurrency", 0))):
+        point = phase_stats(phase, quantile)
+        for key in ("verdict", "reason", "quantile_ci_ms"):
+            if key in phase:
+                point[key] = phase[key]
+        points.append(point)
+    return points
+
+
+def main(args):
+    simulation_start = datetime.now()
+    print(f"Simulation started at: {simulation_start.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    result_data = {
+        "simulation_start": simulation_start.isoformat(),
+        "phases": [],
+    }
+
+    if args.slo_ms is not None:
+        print(f"Searching for the highest rate with p{args.quantile:g} <= {args.slo_ms} ms")
+        knee, censored, phases = search(
+            args.slo_ms, args.quantile, args.start_rate, args.max_rate, args.tolerance,
+            args.warmup, args.max_duration,
+        )
+        result_data["mode"] = "search"
+        result_data["slo"] = {"quantile": args.quantile, "latency_ms": args.slo_ms}
+        result_data["knee_rate"] = knee
+        result_data["knee_censored"] = censored
+        result_data["phases"] = phases
+        result_data["curve"] = curve(phases, args.quantile)
+        if censored:
+            print(f"Knee: >= {knee} msgs/sec (no phase failed up to --max-rate; lower bound only)")
+        else:
+            print(f"Knee: {knee} msgs/sec")
+    elif args.concurrency:
+        result_data["mode"] = "closed"
+        for n in args.concurrency:
+            result_data["phases"].append(run_closed_loop(n, args.duration, args.warmup))
+        result_data["curve"] = curve(result_data["phases"])
+        for point in result_data["curve"]:
+            sampled = point["sampled_in_flight"]
+            check = (
+                f"{sampled:.2f} sampled, ratio {point['littles_law_ratio']:.2f}"
+                if sampled else "not sampled"
+            )
+            print(f"  {point['concurrency']:4d} clients: {point['achieved_rate']:8.1f} calls/sec, "
+                  f"p50 {point['p50_ms']:.2f} ms, p99 {point['p99_ms']:.2f} ms, "
+                  f"Little's law {point['littles_law_in_flight']:.2f} in flight ({check})")
+    else:
+        result_data["mode"] = "schedule"
+        for rate in args.schedule:
+            phase_data = run_load_for_rate(rate, args.duration, args.warmup)
+            result_data["phases"].append(phase_data)
+        result_data["curve"] = curve(result_data["phases"])
+
+    simulation_end = datetime.now()
+    result_data["simulation_end"] = simulation_end.isoformat()
+    result_data["total_duration_seconds"] = (
+        simulation_end - simulation_start
+    ).total_seconds()
+
+    print(f"Simulation ended at: {simulation_end.strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Total duration: {simulation_end - simulation_start}")
+
+    # Save results to JSON
+    timestamp_str = simulation_end.strftime("%Y%m%d_%H%M%S")
+    filename = f"dbus_load_{timestamp_str}.json"
+    with open(filename, "w") as f:
+        json.dump(result_data, f, indent=2)
+
+    print(f"Results written to {filename}")
+
+
+def cli(argv=None, prog=None, defaults=None):
+    parser = argparse.ArgumentParser(prog=prog, description="D-Bus load generator")
+    parser.add_argument(
+        "--schedule",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=SCHEDULE,
+        help="comma-separated rates for the fixed schedule",
+    )
+    parser.add_argument("--duration", type=float, default=DURATION_PER_LEVEL,
+                        help="seconds per scheduled rate or concurrency level")
+    parser.add_argument("--warmup", type=float, default=None,
+                        help=f"seconds discarded at the start of each phase "
+                        f"(default 0 for the schedule, {WARMUP_SEC:g} when searching)")
+    parser.add_argument(
+        "--concurrency",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=None,
+        help="comma-separated client counts for a closed-loop sweep",
+    )
+    parser.add_argument("--slo-ms", type=float, default=None,
+                        help="search for the highest rate meeting this latency SLO")
+    parser.add_argument("--quantile", type=float, default=99, help="SLO percentile")
+    parser.add_argument("--start-rate", type=int, default=50)
+    parser.add_argument("--max-rate", type=int, default=4000)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="stop bisecting when the bracket is this fraction of the rate")
+    parser.add_argument("--max-duration", type=float, default=MAX_MEASURE_SEC,
+                        help="measured seconds per search phase before deciding anyway")
+    config.apply_defaults(parser, defaults)
+    args = parser.parse_args(argv)
+    if args.concurrency and args.slo_ms is not None:
+        parser.error("--concurrency and --slo-ms are separate modes")
+    # A rate of 0 would divide by zero in run_load_for_rate
+    if args.start_rate < 1 or min(args.schedule) < 1:
+        parser.error("rates must be at least 1 msg/sec")
+    if args.max_rate < args.start_rate:
+        parser.error(f"--max-rate ({args.max_rate}) is below --start-rate ({args.start_rate})")
+    if args.concurrency and min(args.concurrency) < 1:
+        parser.error("--concurrency needs at least 1 client per level")
+    if args.warmup is None:
+        args.warmup = WARMUP_SEC if args.slo_ms is not None else 0.0
+
+    main(args)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,309 @@
+import json
+import os
+import pandas as pd
+import numpy as np
+import concurrent.futures
+from collections import Counter, OrderedDict
+from functools import partial
+import sys
+
+from bokeh.io import curdoc
+from bokeh.plotting import figure, ColumnDataSource
+from bokeh.layouts import column, row
+from bokeh.models import RangeTool, PreText
+from bokeh.palettes import Category10_10
+
+from dbusbench import busstore
+from dbusbench import segments
+
+TRUNCATE=100_000
+# Wider views of a segmented capture only show the index's summary counts
+MAX_WINDOW_SECONDS = 15 * 60
+# Bokeh server version - no output_notebook() needed 
+
+# Handle arguments for both command line and Bokeh server
+if len(sys.argv) >= 3:
+    DATA_FILE = sys.argv[1]
+    BUS_FILE = sys.argv[2]
+else:
+    print("Usage: dbusbench serve <RESULTS FILE> <BUS FILE | CAPTURE DIR> [--port N]")
+    print("Or run with: bokeh serve smartplot.py --args results_file.json bus_file.json")
+    sys.exit(1)
+
+# --- Load your data ---
+# First dataset: time series
+with open(DATA_FILE) as f:
+    ts_data = json.load(f)
+
+df_ts = pd.DataFrame(ts_data)
+df_ts["datetime"] = pd.to_datetime(df_ts["timestamp"], unit="s")
+
+# Second dataset: events, kept compact; payloads are decoded only for display.
+# A segmented capture directory is read lazily, one time window at a time.
+if os.path.isdir(BUS_FILE):
+    reader = segments.SegmentReader(BUS_FILE)
+    full_store = full_df_msg = None
+else:
+    reader = None
+    full_store = busstore.MessageStore.load_json(BUS_FILE)
+    full_df_msg = full_store.to_dataframe()
+    full_df_msg["datetime"] = pd.to_datetime(full_df_msg["timestamp"], unit="s")
+
+
+def load_window(start, end):
+    """(store, df_msg) with at least the messages in [start, end] epoch seconds."""
+    if reader is None:
+        return full_store, full_df_msg
+    store = reader.load(start, end)
+    df_msg = store.to_dataframe()
+    df_msg["datetime"] = pd.to_datetime(df_msg["timestamp"], unit="s")
+    return store, df_msg
+
+# --- Prepare ColumnDataSource ---
+source_ts = ColumnDataSource(df_ts)
+
+# --- Time series plots ---
+# Main plot: Messages per Second
+p1 = figure(width=800, height=250, x_axis_type="datetime",
+            title="Messages per Second (avg_msgs_per_sec)")
+p1.line("datetime", "avg_msgs_per_sec", source=source_ts, line_color="blue")
+p1.yaxis.axis_label = "avg_msgs_per_sec"
+if "daemon_reads_per_sec" in df_ts:
+    # Daemon read syscalls (about two per message), not messages
+    p1.line("datetime", "daemon_reads_per_sec", source=source_ts, line_color="orange",
+            line_dash="dashed", legend_label="daemon reads/sec")
+    p1.legend.location = "top_left"
+
+# Second plot: Number of Containers
+p2 = figure(width=800, height=250, x_axis_type="datetime",
+            title="Number of Containers", x_range=p1.x_range)
+p2.line("datetime", "num_containers", source=source_ts, line_color="green")
+p2.yaxis.axis_label = "num_containers"
+
+# Third plot: Busctl Latency
+p3 = figure(width=800, height=250, x_axis_type="datetime",
+            title="Busctl Latency (seconds)", x_range=p1.x_range)
+p3.line("datetime", "busctl_latency", source=source_ts, line_color="red")
+p3.yaxis.axis_label = "busctl_latency (sec)"
+
+# Per-process panels (bus daemon, PID 1, shims), one line per sampled group
+proc_labels = sorted(
+    c[len("proc_"):-len("_cpu_pct")] for c in df_ts.columns
+    if c.startswith("proc_") and c.endswith("_cpu_pct")
+)
+proc_panels = []
+if proc_labels:
+    for field, title, unit in (
+        ("cpu_pct", "Process CPU (% of one core)", "cpu %"),
+        ("ctxsw_per_sec", "Process Context Switches per Second", "switches/sec"),
+        ("rss_bytes", "Process RSS (bytes)", "bytes"),
+        ("fds", "Process Open File Descriptors", "fds"),
+    ):
+        p = figure(width=800, height=200, x_axis_type="datetime",
+                   title=title, x_range=p1.x_range)
+        for label, color in zip(proc_labels, Category10_10):
+            p.line("datetime", f"proc_{label}_{field}", source=source_ts,
+                   line_color=color, legend_label=label)
+        p.yaxis.axis_label = unit
+        p.legend.location = "top_left"
+        p.legend.click_policy = "hide"
+        proc_panels.append(p)
+
+# --- Range selector ---
+select = figure(width=800, height=130, x_axis_type="datetime",
+                y_range=p1.y_range, y_axis_type=None, tools="", toolbar_location=None)
+select.line("datetime", "avg_msgs_per_sec", source=source_ts)
+range_tool = RangeTool(x_range=p1.x_range)
+range_tool.overlay.fill_color = "navy"
+range_tool.overlay.fill_alpha = 0.2
+select.add_tools(range_tool)
+
+# --- Histogram plot ---
+hist_src = ColumnDataSource(data=dict(members=[], counts=[]))
+HIST_TITLE = "Histogram of 'member' Field"
+hist_fig = figure(width=800, height=300, x_range=[], title=HIST_TITLE)
+hist_fig.vbar(x='members', top='counts', width=0.9, source=hist_src)
+hist_fig.xaxis.major_label_orientation = "vertical"
+
+# --- Text boxes for bus JSON data ---
+text_box_1st = PreText(text="", width=800, height=400)
+text_box_1st.text = "Most Common Member JSON (for current time range)\n\nSelect a time range to see bus messages JSON data..."
+
+text_box_2nd = PreText(text="", width=800, height=400)
+text_box_2nd.text = "Second Most Common Member JSON (for current time range)\n\nSelect a time range to see bus messages JSON data..."
+
+def messages_json(store, df_msg, rows):
+    """Largest-first JSON for the given store rows, decoding only what gets shown."""
+    sizes = df_msg["payload_size"].to_numpy()[rows]
+    parts = []
+    total = 0
+    for i in rows[np.argsort(-sizes.astype(np.int64), kind="stable")]:
+        part = json.dumps(store[i].to_dict(), indent=2, default=str)
+        parts.append(part)
+        total += len(part)
+        if total > TRUNCATE:
+            break
+    return "[\n" + ",\n".join(parts) + "\n]"
+
+
+# --- Background computation ---
+# Range changes only bump the generation and queue work; a single worker
+# computes the view off the document lock and hands it back with
+# add_next_tick_callback. Results for superseded ranges are cached but not
+# shown, and recently viewed ranges are served straight from the cache.
+VIEW_CACHE_SIZE = 32
+# Views are computed for the visible range rounded to a grid of about this
+# fraction of its width (a power of two in seconds), so small pans and
+# zooms reuse the same cached view
+VIEW_GRID_FRACTION = 1 / 50
+TITLE_1ST = "Most Common Member JSON (for current time range)"
+TITLE_2ND = "Second Most Common Member JSON (for current time range)"
+
+doc = curdoc()
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+view_cache = OrderedDict()
+generation = 0
+refresh_pending = False
+
+
+def range_bound(value, default):
+    # DataRange1d bounds are NaN (older Bokeh: None) until the browser sets them
+    return default if value is None or np.isnan(value) else value / 1000
+
+
+def current_range():
+    start_s = range_bound(p1.x_range.start, df_ts["timestamp"].min())
+    end_s = range_bound(p1.x_range.end, df_ts["timestamp"].max())
+    return snap_range(float(start_s), float(end_s))
+
+
+def snap_range(start_s, end_s):
+    """Round [start_s, end_s] to the nearest points of the view grid for its width."""
+    width = max(end_s - start_s, 1e-3)
+    step = 2.0 ** np.floor(np.log2(width * VIEW_GRID_FRACTION))
+    return float(np.round(start_s / step) * step), float(np.round(end_s / step) * step)
+
+
+def member_text(title, store, df_msg, rows, member, count):
+    if len(rows) == 0:
+        return f"{title}\n\nMember: '{member}' but no messages found."
+    # Sort messages by payload size (largest first)
+    json_text = messages_json(store, df_msg, rows)
+    if len(json_text) > TRUNCATE:  # Smaller limit since we have two columns
+        json_text = json_text[:TRUNCATE] + "\n... [truncated - too many messages to display]"
+    return (
+        f"{title}\n\nMember: '{member}' ({count} occurrences)\n"
+        f"Showing {len(rows)} messages (sorted by size, largest first):\n\n{json_text}"
+    )
+
+
+def compute_view(start_s, end_s):
+    """Histogram and text for a time range; touches no Bokeh models."""
+    if reader is not None and end_s - start_s > MAX_WINDOW_SECONDS:
+        # Too wide to open every segment; show the index summary instead
+        counts = reader.member_counts(start_s, end_s)
+        hint = f"\n\nZoom in to under {MAX_WINDOW_SECONDS // 60} minutes to see bus messages."
+        return dict(members=list(counts.keys()), counts=list(counts.values()),
+                    text_1st=TITLE_1ST + hint, text_2nd=TITLE_2ND + hint)
+
+    start = pd.to_datetime(start_s, unit="s")
+    end = pd.to_datetime(end_s, unit="s")
+    store, df_msg = load_window(start_s, end_s)
+    in_range = df_msg[(df_msg["datetime"] >= start) & (df_msg["datetime"] <= end)]
+    counts = Counter(in_range["member"].dropna())
+    view = dict(members=list(counts.keys()), counts=list(counts.values()))
+
+    if not counts:
+        empty = "\n\nNo bus messages found in the selected time range."
+        view.update(text_1st=TITLE_1ST + empty, text_2nd=TITLE_2ND + empty)
+        return view
+
+    # Sort members by count to get most and second most common
+    ranked = counts.most_common(2)
+    texts = []
+    for title, (member, count) in zip((TITLE_1ST, TITLE_2ND), ranked):
+        rows = in_range.loc[in_range["member"] == member, "row"].to_numpy()
+        texts.append(member_text(title, store, df_msg, rows, member, count))
+    if len(ranked) < 2:
+        texts.append(TITLE_2ND + "\n\nOnly one unique member found in the selected time range.")
+    view.update(text_1st=texts[0], text_2nd=texts[1])
+    return view
+
+
+def apply_view(view):
+    hist_src.data = dict(members=view["members"], counts=view["counts"])
+    hist_fig.x_range.factors = view["members"]  # Update categorical x-axis
+    text_box_1st.text = view["text_1st"]
+    text_box_2nd.text = view["text_2nd"]
+    hist_fig.title.text = HIST_TITLE
+
+
+def finish(gen, key, view):
+    """Runs on the document thread once the worker is done."""
+    view_cache[key] = view
+    view_cache.move_to_end(key)
+    while len(view_cache) > VIEW_CACHE_SIZE:
+        view_cache.popitem(last=False)
+    if gen == generation:
+        apply_view(view)
+
+
+def fail(gen, error):
+    """Runs on the document thread when the worker could not compute a view."""
+    if gen == generation:
+        message = f"Could not load this time range: {error}"
+        hist_fig.title.text = HIST_TITLE + " (update failed)"
+        text_box_1st.text = f"{TITLE_1ST}\n\n{message}"
+        text_box_2nd.text = f"{TITLE_2ND}\n\n{message}"
+
+
+def work(gen, key):
+    if gen != generation:
+        # Superseded while queued
+        return
+    try:
+        view = compute_view(*key)
+    except Exception as e:
+        # Not cached, so returning to this range retries
+        print(f">>> Failed to compute view for {key}: {e!r}")
+        doc.add_next_tick_callback(partial(fail, gen, e))
+        return
+    doc.add_next_tick_callback(partial(finish, gen, key, view))
+
+
+def update_histogram(attr, old, new):
+    # A pan changes start and end separately; compute once for both
+    global refresh_pending
+    if not refresh_pending:
+        refresh_pending = True
+        doc.add_next_tick_callback(refresh)
+
+
+def refresh():
+    global generation, refresh_pending
+    refresh_pending = False
+    generation += 1
+    key = current_range()
+    if key in view_cache:
+        view_cache.move_to_end(key)
+        apply_view(view_cache[key])
+        return
+    hist_fig.title.text = HIST_TITLE + " (updating...)"
+    executor.submit(work, generation, key)
+
+
+# Initial update
+apply_view(compute_view(*current_range()))
+
+# Set up range change listeners
+p1.x_range.on_change('start', update_histogram)
+p1.x_range.on_change('end', update_histogram)
+doc.on_session_destroyed(lambda context: executor.shutdown(wait=False, cancel_futures=True))
+
+# --- Display ---
+left_column = column(p1, p2, p3, *proc_panels, select, hist_fig)
+middle_column = column(text_box_1st)
+right_column = column(text_box_2nd)
+layout = row(left_column, middle_column, right_column)
+curdoc().add_root(layout)
+curdoc().title = DATA_FILE
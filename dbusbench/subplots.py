@@ -0,0 +1,58 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import re
+import math
+
+from dbusbench.ecdf import dataset_args, load_dataset, load_group
+
+
+def plot_subplots(groups_ms, outfile):
+    """One ECDF subplot with percentile markers per (label, latencies_ms) group."""
+    n_groups = len(groups_ms)
+    n_cols = 2
+    n_rows = math.ceil(n_groups / n_cols)
+
+    fig, axs = plt.subplots(n_rows, n_cols, figsize=(16, 8), dpi=300, sharey=True)
+    axs = np.atleast_1d(axs).flatten()
+
+    #for ax, (label, file_list) in zip(axs, groups.items()):
+    for ax, (label, latencies) in zip(axs, groups_ms):
+        sorted_vals = np.sort(latencies)
+        y_vals = np.arange(1, len(sorted_vals) + 1) / len(sorted_vals)
+        
+        ax.plot(sorted_vals, y_vals, linestyle="-", color="C0")
+        
+        # Percentile annotations
+        for perc in [0, 50, 90, 95]:
+            t = np.percentile(sorted_vals, perc)
+            # Find the closest y-value in the ECDF for this x
+            y_pos = y_vals[np.searchsorted(sorted_vals, t)]
+            ax.axvline(t, alpha=0.15, color="C0", linestyle="--")
+            # Place text slightly above the curve
+            ax.text(t, y_pos + 0.02, f"p{perc}: {t:.2f} ms",
+                    rotation=0, va="bottom", ha="center", fontsize=6, color="C0") 
+
+        ax.set_title(label)
+        ax.set_xlabel("lag (ms)")
+        ax.set_ylabel("Cumulative probability")
+        ax.grid(True, linestyle="--", alpha=0.6)
+
+    # Hide unused subplots
+    for ax in axs[n_groups:]:
+        ax.set_visible(False)
+
+    fig.suptitle("DBus Lag ECDF Comparison by Group", fontsize=16)
+    fig.tight_layout(rect=[0, 0, 1, 0.96])
+
+    fig.savefig(outfile)
+    return fig
+
+
+if __name__ == "__main__":
+    groups = load_dataset(dataset_args("One ECDF subplot per group of probe latencies").dataset)
+
+    safe_filename = re.sub(r"[^\w\-]", "_", "dbus_lag_ecdf_subplots") + ".png"
+    plot_subplots([(label, load_group(file_list)) for label, file_list in groups], safe_filename)
+    print(f"Saved plot as {safe_filename}")
+
+    plt.show()
@@ -75,6 +75,6 @@ groups = [
 #groups = sorted(groups.items(), key=lambda k : k[0])
 
 groups = [
-    ("gvisor cgroupfs": ["final/"]),
-    ("gvisor systemd":  ["final/"]),
+    ("gvisor cgroupfs", ["final/"]),
+    ("gvisor systemd",  ["final/"]),
 ]
@@ -11,23 +11,24 @@ if [ "$systemd" != "on" ] && [ "$systemd" != "off" ]; then
     exit 1
 fi
 
-# start mon3.py
+# start the latency probe
 timestamp=$(date '+%Y%m%d%H%M%S')
 logfile="systemd_${systemd}_${n_cont}.json"
-sudo /home/ec2-user/mon3.py $logfile >/dev/null &
+sudo python3 -m dbusbench probe $logfile >/dev/null &
 echo "started monitoring on $logfile"
 
 sleep 10
 
 echo "starting containers"
-BUNDLE="/home/ec2-user/load/bundle/"
+# OCI bundle to run; override with BUNDLE=/path/to/bundle
+BUNDLE="${BUNDLE:-/home/ec2-user/load/bundle/}"
 for i in $(seq 1 "$n_cont"); do
     if [ "$systemd" == "on" ]; then
         sudo $rt -systemd-cgroup \
-            run -bundle $BUNDLE -detach "container_$i" &
+            run -bundle "$BUNDLE" -detach "container_$i" &
     else
         sudo $rt \
-            run -bundle $BUNDLE -detach "container_$i" &
+            run -bundle "$BUNDLE" -detach "container_$i" &
     fi
     echo "started container_$i/$n_cont"
 done
@@ -69,15 +70,15 @@ else
 fi
 
 
-# kill the of the mon3.py to stop writing
+# stop the probe so it writes its results
 echo "wrote results to $logfile"
 
-# Kill the process started by mon3.py
-mon3_pid=$(pgrep -f "/home/ec2-user/mon3.py")
-if [ -n "$mon3_pid" ]; then
-    echo "$mon3_pid" | xargs sudo kill -SIGINT
-    echo "Stopped mon3.py processes"
+# Kill the probe process
+probe_pid=$(pgrep -f "dbusbench probe")
+if [ -n "$probe_pid" ]; then
+    echo "$probe_pid" | xargs sudo kill -SIGINT
+    echo "Stopped probe processes"
 else
-    echo "No mon3.py process found to stop"
+    echo "No probe process found to stop"
 fi
 
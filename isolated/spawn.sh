@@ -1,6 +1,7 @@
 #!/bin/bash
 
-BUNDLE="/home/ec2-user/load/bundle/"
+# OCI bundle to run; override with BUNDLE=/path/to/bundle
+BUNDLE="${BUNDLE:-/home/ec2-user/load/bundle/}"
 
 N=300
 
@@ -8,7 +9,7 @@ for i in $(seq 1 $N); do
     container_dir="container_$i"
 
     runc \
-        run -bundle $BUNDLE -d "container_$i" &
+        run -bundle "$BUNDLE" -d "container_$i" &
 
     echo "Started container_$i"
 done
@@ -6,4 +6,4 @@ results="$1"
 bus="$2"
 port="$3"
 
-bokeh serve ~/benchmarking/smartplot.py --port $port --args $results $bus $port --show
+dbusbench serve "$results" "$bus" --port "$port" --show
@@ -0,0 +1,131 @@
+import asyncio
+import shutil
+import subprocess
+
+import pytest
+
+from dbusbench import busconn, busfilter, busstats
+
+CONFIG = """<!DOCTYPE busconfig PUBLIC "-//freedesktop//DTD D-Bus Bus Configuration 1.0//EN"
+ "http://www.freedesktop.org/standards/dbus/1.0/busconfig.dtd">
+<busconfig>
+  <type>session</type>
+  <listen>unix:path={path}</listen>
+  <auth>EXTERNAL</auth>
+  <policy context="default">
+    <allow send_destination="*"/>
+    <allow receive_sender="*"/>
+    <allow own="*"/>
+  </policy>
+</busconfig>
+"""
+
+
+class PrivateBus:
+    """A dbus-daemon on a socket in ``tmp_path`` that can be stopped and restarted."""
+
+    def __init__(self, tmp_path):
+        sock = tmp_path / "bus.sock"
+        self.conf = tmp_path / "bus.conf"
+        self.conf.write_text(CONFIG.format(path=sock))
+        self.address = f"unix:path={sock}"
+        self.daemon = None
+
+    def start(self):
+        self.daemon = subprocess.Popen(
+            ["dbus-daemon", "--nofork", f"--config-file={self.conf}", "--print-address"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.daemon.stdout.readline()
+
+    def stop(self):
+        self.daemon.terminate()
+        self.daemon.wait()
+
+
+@pytest.fixture
+def private_bus(tmp_path):
+    if shutil.which("dbus-daemon") is None:
+        pytest.skip("dbus-daemon not installed")
+    bus = PrivateBus(tmp_path)
+    bus.start()
+    yield bus
+    bus.stop()
+
+
+@pytest.fixture
+def bus(private_bus):
+    return private_bus.address
+
+
+def test_calls_share_one_connection(bus):
+    async def run():
+        conn = await busconn.Connection.open(bus)
+        names = await conn.call(*busstats.DBUS, "org.freedesktop.DBus", "ListNames")
+        # Pipelined calls all get their own reply
+        owners = await asyncio.gather(*(
+            conn.call(*busstats.DBUS, "org.freedesktop.DBus", "GetNameOwner", "s", conn.unique_name)
+            for _ in range(20)
+        ))
+        creds = await conn.call(
+            *busstats.DBUS, "org.freedesktop.DBus", "GetConnectionCredentials", "s", conn.unique_name
+        )
+        with pytest.raises(busconn.DBusError) as err:
+            await conn.call(*busstats.DBUS, "org.freedesktop.DBus", "GetNameOwner", "s", "no.such.name")
+        await conn.close()
+        return conn.unique_name, names, owners, creds, err.value
+
+    unique, names, owners, creds, err = asyncio.run(run())
+    assert unique in names
+    assert owners == [unique] * 20
+    assert isinstance(creds["ProcessID"], int)
+    assert err.name == "org.freedesktop.DBus.Error.NameHasNoOwner"
+
+
+def test_socket_path():
+    assert busconn.socket_path("unix:path=/run/x,guid=abc") == "/run/x"
+    assert busconn.socket_path("tcp:host=a;unix:abstract=/tmp/y") == "\0/tmp/y"
+    with pytest.raises(ValueError):
+        busconn.socket_path("tcp:host=a,port=1")
+
+
+def test_poller_survives_a_daemon_restart(private_bus):
+    async def run():
+        poller = busstats.StatsPoller(private_bus.address)
+        ticks = [await poller.poll()]
+        private_bus.stop()
+        ticks.append(await poller.poll())
+        ticks.append(await poller.poll())
+        private_bus.start()
+        ticks.append(await poller.poll())
+        await poller.close()
+        return ticks
+
+    up, down, still_down, back = asyncio.run(run())
+    assert up[0]["connections"] >= 1
+    for totals, conns in (down, still_down):
+        assert totals == dict.fromkeys(busstats.TOTALS) and conns == []
+    assert back[0]["connections"] >= 1
+
+
+def test_traffic_counter_reads_daemon_io(bus):
+    async def run():
+        counter = busfilter.TrafficCounter(bus)
+        await counter.run()
+        conn = await busconn.Connection.open(bus)
+        for _ in range(50):
+            await conn.call(*busstats.DBUS, "org.freedesktop.DBus", "ListNames")
+        await conn.close()
+        return counter.reads, counter.read_bytes
+
+    reads, read_bytes = asyncio.run(run())
+    # Each call is at least one read by the daemon
+    assert reads >= 50
+    assert read_bytes > 0
+
+
+def test_traffic_counter_without_a_daemon(tmp_path):
+    counter = busfilter.TrafficCounter(f"unix:path={tmp_path}/missing.sock")
+    asyncio.run(counter.run())
+    assert counter.reads is None
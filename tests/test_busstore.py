@@ -0,0 +1,41 @@
+import json
+
+from dbusbench import asyncbench, busstore
+
+LINES = [
+    # A payload string that contains the key pattern itself, escaped
+    '{"type":"signal","timestamp-realtime":1754606725123456,"sender":":1.5","path":"/a",'
+    '"interface":"i.f","member":"M","payload":{"type":"s","data":["a,\\"payload\\":}b ü"]}}\n',
+    '{"type":"method_call","timestamp-realtime":1754606725123999,"sender":":1.9","member":"Hello"}\n',
+]
+
+
+def test_split_line_matches_full_decode():
+    for line in LINES:
+        raw = line.encode()
+        header, payload = asyncbench.split_line(raw)
+        full = json.loads(raw)
+        assert json.loads(payload) == full.pop("payload", None)
+        assert header == full
+
+
+def test_append_raw_matches_append():
+    decoded, raw = busstore.MessageStore(), busstore.MessageStore()
+    for line in LINES:
+        decoded.append(asyncbench.handle_line(json.loads(line)))
+        header, payload = asyncbench.split_line(line.encode())
+        raw.append_raw(asyncbench.handle_line(header), payload)
+    assert [m.to_dict() for m in raw] == [m.to_dict() for m in decoded]
+
+
+def test_dump_json_writes_raw_payloads(tmp_path):
+    store = busstore.MessageStore()
+    for line in LINES:
+        header, payload = asyncbench.split_line(line.encode())
+        store.append_raw(asyncbench.handle_line(header), payload)
+    path = tmp_path / "bus.json"
+    with open(path, "w", encoding="utf-8") as f:
+        store.dump_json(f)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == [m.to_dict() for m in store]
+    assert busstore.MessageStore.load_json(path)[0].payload == store[0].payload
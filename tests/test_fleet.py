@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pytest
+
+from dbusbench import fleet
+
+DURATION = 120.0
+FLEET0 = 1_700_000_000.0
+
+
+@pytest.fixture
+def merged(tmp_path):
+    truth = fleet.synthesize(str(tmp_path / "in"), hosts=3, duration=DURATION, seed=1)
+    fleet.merge([str(tmp_path / "in")], str(tmp_path / "out"))
+    with open(tmp_path / "out" / "alignment.json") as f:
+        alignment = {a["key"]: a for a in json.load(f) if a["file"].endswith("results_synth.json")}
+    return truth, alignment, tmp_path / "out"
+
+
+def test_referenced_hosts_recover_offset_and_drift(merged):
+    truth, alignment, _out = merged
+    for host, t in truth.items():
+        if not t["referenced"]:
+            continue
+        a = alignment[host]
+        assert a["offset_s"] == pytest.approx(t["offset_s"], abs=1e-3)
+        assert a["drift_ppm"] == pytest.approx(t["drift_ppm"], abs=2.0)
+
+
+def test_aligned_timestamps_land_on_the_fleet_clock(merged):
+    truth, _alignment, out = merged
+    for host, t in truth.items():
+        if not t["referenced"]:
+            continue
+        with open(out / "aligned" / host / "results_synth.json") as f:
+            ts = np.array([r["timestamp"] for r in json.load(f)])
+        # synthesize() samples every 0.1 s of true fleet time from FLEET0
+        ideal = FLEET0 + np.arange(ts.size) * 0.1
+        assert np.abs(ts - ideal).max() < 1e-3
+
+
+def test_unreferenced_host_keeps_its_clock_but_reports_the_step(merged):
+    truth, alignment, _out = merged
+    a = alignment["host0"]
+    assert not a["referenced"]
+    assert a["steps_s"] == pytest.approx([truth["host0"]["step_s"]], abs=1e-3)
@@ -0,0 +1,86 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dbusbench import lifecycle
+
+BACKGROUND_RATE = 10.0
+PER_START = 5
+
+
+def synthetic_run(starts):
+    """Uniform background traffic over [0, 100) plus PER_START messages per start."""
+    background = np.arange(0.0, 100.0, 1 / BACKGROUND_RATE)
+    bursts = np.repeat(np.asarray(starts) + 0.5, PER_START)
+    ts = np.sort(np.concatenate([background, bursts]))
+    bus = pd.DataFrame({
+        "timestamp": ts,
+        "interface": pd.Categorical(["org.example"] * len(ts)),
+        "member": pd.Categorical(["Ping"] * len(ts)),
+        "bytes": np.full(len(ts), 100),
+    })
+    events = pd.DataFrame({"timestamp": starts, "kind": "start", "containers": 1})
+    results = pd.DataFrame({"timestamp": [0.0, 100.0], "num_containers": [0, len(starts)]})
+    return results, bus, events
+
+
+def test_overlapping_windows_subtract_background_once():
+    # Starts 1 s apart with a 3 s window: every window overlaps its neighbours
+    results, bus, events = synthetic_run(np.arange(30.0, 50.0))
+    report = lifecycle.analyze_run(results, bus, events)
+    assert report["background_msgs_per_sec"] == pytest.approx(BACKGROUND_RATE, rel=0.01)
+    assert report["start"]["msgs_per_container"] == pytest.approx(PER_START, abs=0.2)
+    assert report["start"]["bytes_per_container"] == pytest.approx(PER_START * 100, abs=20)
+    by_member = report["start"]["msgs_per_container_by_member"]
+    assert by_member["org.example.Ping"] == pytest.approx(PER_START, abs=0.2)
+
+
+def test_windows_are_clipped_to_the_bus_log():
+    # The first window starts before the log and the last one ends after it
+    results, bus, events = synthetic_run([0.5, 10.0, 99.0])
+    exposure = lifecycle.exposure(events, bus)
+    assert exposure[0] == pytest.approx(2.5)
+    assert exposure[-1] == pytest.approx(bus["timestamp"].iloc[-1] - 98.0)
+    report = lifecycle.analyze_run(results, bus, events)
+    assert report["background_msgs_per_sec"] == pytest.approx(BACKGROUND_RATE, rel=0.01)
+
+
+def test_detect_events_ignores_unknown_counts():
+    results = pd.DataFrame({
+        "timestamp": np.arange(6.0),
+        "num_containers": [None, 5, 5, None, 5, 7],
+    })
+    events = lifecycle.detect_events(results)
+    assert events["timestamp"].tolist() == [5.0]
+    assert events["kind"].tolist() == ["start"]
+    assert events["containers"].tolist() == [2]
+
+
+def test_analyze_run_from_files(tmp_path):
+    results, bus, events = synthetic_run([30.0, 60.0])
+    results_file = tmp_path / "results.json"
+    bus_file = tmp_path / "bus.json"
+    events_file = tmp_path / "events.json"
+    results_file.write_text(json.dumps([
+        {"timestamp": 1.7e9 + t + 0.25, "num_containers": int(n), "busctl_latency": 0.01}
+        for t, n in zip(np.arange(100.0), np.searchsorted([30.0, 60.0], np.arange(100.0), "right"))
+    ]))
+    bus_file.write_text(json.dumps([
+        {"timestamp": 1.7e9 + t, "type": "signal", "interface": "org.example",
+         "member": "Ping", "_payload": {"n": 1}}
+        for t in bus["timestamp"]
+    ]))
+    events_file.write_text(json.dumps([
+        {"timestamp": 1.7e9 + t, "event": "start", "container": f"c{i}"}
+        for i, t in enumerate(events["timestamp"])
+    ]))
+
+    results = lifecycle.load_results(results_file)
+    assert pd.api.types.is_float_dtype(results["timestamp"])
+    bus = lifecycle.load_bus(bus_file)
+    for events in (None, lifecycle.load_events(events_file)):
+        report = lifecycle.analyze_run(results, bus, events)
+        assert report["start"]["containers"] == 2
+        assert report["background_msgs_per_sec"] == pytest.approx(BACKGROUND_RATE, rel=0.05)
@@ -0,0 +1,51 @@
+import asyncio
+import os
+
+from dbusbench import procstat
+
+
+def test_sample_is_served_from_the_last_read():
+    sampler = procstat.ProcSampler({"self": (str(os.getpid()),)})
+    assert sampler.sample()["proc_self_procs"] is None
+
+    row = sampler.update()
+    assert row["proc_self_procs"] == 1
+    assert row["proc_self_threads"] >= 1
+    assert sampler.sample() is row
+
+
+def test_large_groups_are_read_less_often(monkeypatch):
+    monkeypatch.setattr(procstat, "LARGE_GROUP", 0)
+    sampler = procstat.ProcSampler(
+        {"self": (str(os.getpid()),)}, interval=0.0, large_interval=3600.0
+    )
+    reads = []
+    read = sampler._read
+    monkeypatch.setattr(sampler, "_read", lambda pid: reads.append(pid) or read(pid))
+
+    first = sampler.update()
+    second = sampler.update()
+    assert len(reads) == 1
+    assert second["proc_self_rss_bytes"] == first["proc_self_rss_bytes"]
+
+
+def test_run_reads_in_the_background():
+    sampler = procstat.ProcSampler({"self": (str(os.getpid()),)}, interval=0.01)
+
+    async def main():
+        task = asyncio.create_task(sampler.run())
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(main())
+    assert sampler.sample()["proc_self_procs"] == 1
+    assert sampler.sample()["proc_self_cpu_pct"] is not None
+
+
+def test_group_without_processes_is_unknown():
+    sampler = procstat.ProcSampler({"none": ("no-such-comm",)})
+    row = sampler.update()
+    assert row["proc_none_procs"] == 0
+    assert row["proc_none_cpu_pct"] is None
+    assert row["proc_none_rss_bytes"] is None
+    assert row["proc_none_fds"] is None
@@ -0,0 +1,37 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from dbusbench import raster
+
+
+@pytest.fixture
+def berlin():
+    old = os.environ.get("TZ")
+    os.environ["TZ"] = "Europe/Berlin"
+    time.tzset()
+    yield
+    if old is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = old
+    time.tzset()
+
+
+def test_to_num_follows_dst_change(berlin):
+    # Clocks go back from 03:00 CEST to 02:00 CET at 2025-10-26 01:00 UTC
+    change = 1761440400.0
+    t = np.arange(change - 3600, change + 3600, 60.0)
+    expected = [(x + time.localtime(x).tm_gmtoff) / raster.SECONDS_PER_DAY for x in t]
+    np.testing.assert_allclose(raster.to_num(t), expected, rtol=0, atol=1e-9)
+
+
+def test_envelope_skips_unknown_samples():
+    t = np.arange(8.0)
+    y = np.array([1.0, np.nan, 3.0, np.nan, np.nan, np.nan, 2.0, 4.0])
+    centers, ymin, ymax, ymean = raster.envelope(t, y, 2)
+    assert ymin.tolist() == [1.0, 2.0]
+    assert ymax.tolist() == [3.0, 4.0]
+    assert ymean.tolist() == [2.0, 3.0]
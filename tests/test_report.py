@@ -0,0 +1,24 @@
+import json
+
+from dbusbench import report
+
+
+def test_discover_prunes_only_the_output_directory(tmp_path):
+    for rel in ("run/a.json", "report/cached.json", "report_old/b.json"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("[]")
+    found = sorted(report.discover(str(tmp_path), str(tmp_path / "report")))
+    assert found == [str(tmp_path / "report_old/b.json"), str(tmp_path / "run/a.json")]
+
+
+def test_bus_logs_are_classified_without_loading(tmp_path, monkeypatch):
+    bus = tmp_path / "bus.json"
+    msg = {"timestamp": 1.0, "type": "signal", "member": "Ping", "_payload": {}}
+    # Truncated: only a prefix is valid JSON
+    bus.write_text("[\n" + json.dumps(msg, indent=2) + ",\n" + json.dumps(msg)[:10])
+    assert report.parse(str(bus), str(tmp_path / "bus.npz")) == "bus"
+
+    probe = tmp_path / "probe.json"
+    probe.write_text(json.dumps([{"timestamp": 1.0, "latency": 0.002}]))
+    assert report.parse(str(probe), str(tmp_path / "probe.npz")) == "probe"
+    assert (tmp_path / "probe.npz").exists()
@@ -0,0 +1,23 @@
+from dbusbench import segments
+
+
+def message(ts, member):
+    return {"timestamp": ts, "type": "signal", "member": member, "_payload": {"n": ts}}
+
+
+def test_writer_round_trip_without_member_in_index(tmp_path):
+    writer = segments.SegmentWriter(str(tmp_path), segment_seconds=10)
+    msgs = [message(float(t), None if t % 3 == 0 else "Ping") for t in range(25)]
+    for msg in msgs:
+        writer.append(msg)
+    writer.close()
+
+    reader = segments.SegmentReader(str(tmp_path))
+    assert [s["name"] for s in reader.segments] == ["seg_000000", "seg_000001", "seg_000002"]
+    counts = reader.member_counts(0, 25)
+    assert counts == {"Ping": sum(1 for m in msgs if m["member"])}
+
+    store = reader.load(5, 14)
+    assert [m.timestamp for m in store] == [float(t) for t in range(5, 15)]
+    assert [m.member for m in store] == [msgs[t]["member"] for t in range(5, 15)]
+    assert store[0].payload == {"n": 5.0}
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from dbusbench import simulation
+
+
+def test_quantile_ci_brackets_the_median_rank():
+    samples = np.arange(1.0, 101.0)
+    # n*q = 50, half-width 1.96 * sqrt(100 * 0.25) = 9.8 ranks
+    assert simulation.quantile_ci(samples, 50) == (40.0, 61.0)
+    # The upper rank (ceil(2.97 + 0.34) = 4) is clipped to the largest sample
+    assert simulation.quantile_ci([3.0, 1.0, 2.0], 99) == (2.0, 3.0)
+
+
+def samples(n, value_ms):
+    return [float(value_ms)] * n
+
+
+def test_judge_decisions():
+    slo, q, rate = 20.0, 99, 100
+    # q=99 needs n >= 500 before a latency verdict is possible
+    verdict, estimate, _ci = simulation.judge(samples(499, 1), 5.0, rate, slo, q)
+    assert verdict is None and estimate == 1.0
+    assert simulation.judge(samples(500, 1), 5.0, rate, slo, q)[0] == "pass"
+    assert simulation.judge(samples(500, 50), 5.0, rate, slo, q)[0] == "fail"
+    # Close to the limit: the interval straddles the SLO
+    close = list(np.linspace(1, 30, 1000))
+    assert simulation.judge(close, 10.0, rate, 29.8, q)[0] is None
+    # Completions far behind the offered rate fail whatever the latency
+    assert simulation.judge(samples(100, 1), 10.0, rate, slo, q)[0] == "fail"
+    assert simulation.judge([], 5.0, rate, slo, q) == (None, None, None)
+
+
+@pytest.fixture
+def threshold(monkeypatch):
+    """Stub run_search_phase: rates up to the threshold pass."""
+    def stub(limit):
+        def run_search_phase(rate, *args):
+            return {"rate_per_sec": rate, "verdict": "pass" if rate <= limit else "fail"}
+        monkeypatch.setattr(simulation, "run_search_phase", run_search_phase)
+    return stub
+
+
+def test_search_bisects_to_the_threshold(threshold):
+    threshold(730)
+    knee, censored, phases = simulation.search(20.0, start_rate=50, max_rate=4000)
+    assert (knee, censored) == (725, False)
+    assert [p["rate_per_sec"] for p in phases[:5]] == [50, 100, 200, 400, 800]
+
+
+def test_search_without_a_failure_is_censored_at_max_rate(threshold):
+    threshold(10**9)
+    knee, censored, phases = simulation.search(20.0, start_rate=50, max_rate=4000)
+    assert (knee, censored) == (4000, True)
+    assert phases[-1]["rate_per_sec"] == 4000
+
+
+def test_search_failing_at_the_start_rate(threshold):
+    threshold(10)
+    assert simulation.search(20.0, start_rate=50, max_rate=4000)[:2] == (None, False)
+
+
+@pytest.mark.parametrize("argv", [
+    ["--slo-ms", "20", "--start-rate", "0"],
+    ["--slo-ms", "20", "--start-rate", "500", "--max-rate", "100"],
+    ["--schedule", "100,0"],
+])
+def test_cli_rejects_unusable_rates(argv):
+    with pytest.raises(SystemExit):
+        simulation.cli(argv)
+
+
+def test_phase_stats_checks_littles_law_against_sampled_calls():
+    phase = {
+        "concurrency": 4,
+        "measured_sec": 1.0,
+        "call_durations_ms": [10.0] * 400,
+        "in_flight_samples": [2, 2, 1, 3],
+    }
+    stats = simulation.phase_stats(phase)
+    assert stats["littles_law_in_flight"] == pytest.approx(4.0)
+    assert stats["sampled_in_flight"] == pytest.approx(2.0)
+    assert stats["littles_law_ratio"] == pytest.approx(2.0)
+    assert stats["client_utilization"] == pytest.approx(0.5)
+
+    del phase["in_flight_samples"]
+    stats = simulation.phase_stats(phase)
+    assert stats["sampled_in_flight"] is None
+    assert stats["littles_law_ratio"] is None